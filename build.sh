@@ -2,4 +2,8 @@
 
 # Build the project
 echo "Building the project..."
-python3.8 -m pip install -r requirements.txt
\ No newline at end of file
+python3.8 -m pip install -r requirements.txt
+
+# The serverless filesystem is read-only, so ship bytecode instead of compiling on every cold start
+echo "Compiling bytecode..."
+python3.8 -m compileall -q -x '(^|/)(env|staticfiles)/' .
@@ -0,0 +1,5 @@
+from django.contrib import admin
+from .models import StatsCounter, DailyStatsRollup
+
+admin.site.register(StatsCounter)
+admin.site.register(DailyStatsRollup)
@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+from django.conf import settings
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'core'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        if not settings.LAZY_CELERY_APP:
+            # Make the project's app current before any @shared_task is sent
+            import liture.celery  # noqa: F401
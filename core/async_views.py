@@ -0,0 +1,171 @@
+"""
+Async read paths for DRF viewsets
+
+DRF dispatches synchronously, so async_viewset_view() builds a view that
+awaits a viewset's a<action>() handler (e.g. alist, aretrieve) on the
+event loop and serves every other action through the regular sync view in
+a thread. initial() (authentication, permissions, content negotiation)
+runs in a thread as well, since it may query the database; the handler
+itself uses the async ORM.
+
+Django 4.2 runs the thread-sensitive work of each ASGI request, the
+async ORM included, on a new thread with its own database connection.
+initial() and the sync fallback run on shared pool threads instead,
+which keep their connections for CONN_MAX_AGE like sync workers do, so a
+cached response costs no connect; the request thread's connection, used
+when the async ORM ran, is closed once the view returns.
+
+Under WSGI Django would run these views in a new event loop per request,
+so the async routes are only mounted when ASYNC_VIEWS is set, for the
+ASGI deployment (liture/asgi.py).
+"""
+import functools
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.db import close_old_connections, connections
+from django.http import Http404
+from django.urls import re_path
+from rest_framework.response import Response
+
+
+def _with_own_connection(func, *args, **kwargs):
+    # Drop this pool thread's connection if it broke or outlived CONN_MAX_AGE, as a request start would
+    close_old_connections()
+    return func(*args, **kwargs)
+
+
+def database_sync_to_async(func):
+    """sync_to_async() on a pool thread that reuses its database connection across calls"""
+    return sync_to_async(functools.partial(_with_own_connection, func), thread_sensitive=False)
+
+
+def _close_connections():
+    for conn in connections.all(initialized_only=True):
+        conn.close()
+
+
+async def adispatch(view, request, *args, **kwargs):
+    """APIView.dispatch() with the a<action>() handler awaited"""
+    view.args = args
+    view.kwargs = kwargs
+    request = view.initialize_request(request, *args, **kwargs)
+    view.request = request
+    view.headers = view.default_response_headers
+
+    try:
+        await database_sync_to_async(view.initial)(request, *args, **kwargs)
+        response = await getattr(view, f'a{view.action}')(request, *args, **kwargs)
+    except Exception as exc:
+        response = view.handle_exception(exc)
+
+    view.response = view.finalize_response(request, response, *args, **kwargs)
+    if isinstance(view.response, Response):
+        if view.response.accepted_renderer.format == 'json':
+            # JSON renders without the database, so skip the thread hop
+            view.response.render()
+        else:
+            await sync_to_async(view.response.render)()
+    return view.response
+
+
+def async_viewset_view(viewset_class, actions, **initkwargs):
+    """Like viewset_class.as_view(actions), awaiting the actions that have an async handler"""
+    sync_view = viewset_class.as_view(actions, **initkwargs)
+    actions = dict(actions)
+    if 'get' in actions:
+        actions.setdefault('head', actions['get'])
+
+    async def view(request, *args, **kwargs):
+        action = actions.get(request.method.lower())
+        if action is None or not hasattr(viewset_class, f'a{action}'):
+            return await database_sync_to_async(sync_view)(request, *args, **kwargs)
+
+        self = viewset_class(**initkwargs)
+        self.action_map = actions
+        for method, name in actions.items():
+            setattr(self, method, getattr(self, name))
+        self.request = request
+        try:
+            return await adispatch(self, request, *args, **kwargs)
+        finally:
+            # The request thread goes away with the request; don't leave its connection open
+            await sync_to_async(_close_connections)()
+
+    # Django's csrf_exempt() only wraps sync views in 4.2
+    view.csrf_exempt = True
+    view.cls = viewset_class
+    view.initkwargs = initkwargs
+    view.actions = actions
+    return view
+
+
+def async_routes(prefix, viewset_class, basename):
+    """URL patterns for a viewset's list and detail routes, as DefaultRouter names them"""
+    return [
+        re_path(
+            rf'^{prefix}/$',
+            async_viewset_view(
+                viewset_class, {'get': 'list', 'post': 'create'},
+                basename=basename, detail=False, suffix='List',
+            ),
+            name=f'{basename}-list',
+        ),
+        re_path(
+            rf'^{prefix}/(?P<pk>[^/.]+)/$',
+            async_viewset_view(
+                viewset_class,
+                {'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'},
+                basename=basename, detail=True, suffix='Instance',
+            ),
+            name=f'{basename}-detail',
+        ),
+    ]
+
+
+def async_action_routes(prefix, viewset_class, basename, actions):
+    """URL patterns for detail=False GET @actions of a viewset"""
+    return [
+        re_path(
+            rf'^{prefix}/{action}/$',
+            async_viewset_view(viewset_class, {'get': action}, basename=basename, detail=False),
+            name=f'{basename}-{action.replace("_", "-")}',
+        )
+        for action in actions
+    ]
+
+
+class AsyncReadMixin:
+    """
+    alist() / aretrieve(): list() and retrieve() through the async ORM
+
+    Mixins that wrap list/retrieve (response cache, conditional GET,
+    compiled serializers) provide matching async methods, so both paths
+    return the same responses.
+    """
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+        return await self.paginator.apaginate_queryset(queryset, self.request, view=self)
+
+    async def aget_object(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except queryset.model.DoesNotExist:
+            raise Http404(f'No {queryset.model._meta.object_name} matches the given query.')
+        except (TypeError, ValueError, ValidationError):
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer([row async for row in queryset], many=True).data)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return Response(self.get_serializer(await self.aget_object()).data)
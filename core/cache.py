@@ -0,0 +1,83 @@
+"""
+Caching for dashboard statistics
+
+Every stats key embeds a generation number. Invalidation bumps the
+generation instead of deleting keys, so entries for arbitrary parameters
+(e.g. any `limit` of recent_registrations) are dropped at once and the
+old ones simply expire through their TTL. Recomputation goes through
+core.stampede, so one worker recomputes an expired entry while the others
+serve the stale one.
+"""
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from core.stampede import aget_or_compute, get_or_compute
+
+
+STATS_GENERATION_KEY = 'stats:generation'
+
+
+def _stats_generation():
+    generation = cache.get(STATS_GENERATION_KEY)
+    if generation is None:
+        # Seed from the clock so a lost generation never reuses old keys
+        cache.add(STATS_GENERATION_KEY, int(time.time()), timeout=None)
+        generation = cache.get(STATS_GENERATION_KEY)
+    return generation
+
+
+async def _astats_generation():
+    generation = await cache.aget(STATS_GENERATION_KEY)
+    if generation is None:
+        await cache.aadd(STATS_GENERATION_KEY, int(time.time()), timeout=None)
+        generation = await cache.aget(STATS_GENERATION_KEY)
+    return generation
+
+
+def _key_part(value):
+    if isinstance(value, (tuple, list)):
+        return ','.join(_key_part(item) for item in value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def _stats_key(generation, endpoint, params):
+    parts = [f'{name}={_key_part(params[name])}' for name in sorted(params)]
+    return ':'.join(['stats', str(generation), endpoint, *parts])
+
+
+def stats_cache_key(endpoint, **params):
+    """Build the cache key for a stats endpoint and its parameters"""
+    return _stats_key(_stats_generation(), endpoint, params)
+
+
+def get_cached_stats(endpoint, compute, **params):
+    """
+    Return (data, cached) for a stats endpoint
+
+    `compute` is called with `params` on a miss and its result is stored
+    for STATS_CACHE_TIMEOUT seconds.
+    """
+    key = stats_cache_key(endpoint, **params)
+    return get_or_compute(key, lambda: compute(**params), settings.STATS_CACHE_TIMEOUT)
+
+
+async def aget_cached_stats(endpoint, acompute, **params):
+    """get_cached_stats() for async views; `acompute` is a coroutine function"""
+    key = _stats_key(await _astats_generation(), endpoint, params)
+    return await aget_or_compute(key, lambda: acompute(**params), settings.STATS_CACHE_TIMEOUT)
+
+
+def invalidate_stats_cache():
+    """Drop every cached stats entry by moving to a new generation"""
+    try:
+        cache.incr(STATS_GENERATION_KEY)
+    except ValueError:
+        cache.add(STATS_GENERATION_KEY, int(time.time()), timeout=None)
+
+
+def schedule_stats_invalidation():
+    """Invalidate once the current transaction commits"""
+    transaction.on_commit(invalidate_stats_cache)
@@ -0,0 +1,249 @@
+"""
+Compiled read-only serialization for list endpoints
+
+compile_serializer() turns a ModelSerializer declaration into a field plan
+once per class: the .values() lookup behind every output key, following
+nested serializers and dotted sources through foreign keys. Rows fetched
+with those lookups are turned into the same dicts DRF would produce, using
+each field's own to_representation(), but without loading model instances
+or walking attributes field by field. Serializers the plan cannot express
+exactly (method fields, many=True, custom to_representation, ...) compile
+to None and keep using the regular DRF path.
+"""
+import uuid
+from functools import lru_cache
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework import serializers
+from django.http import HttpResponse
+from rest_framework.fields import Field
+from rest_framework.response import Response
+from users.pagination import keyset_ordering
+from core.pg_json import database_json_row
+from core.renderers import ORJSONRenderer
+from core.fragments import FragmentCacheMixin
+
+
+# to_representation() implementations whose output the plan reproduces
+EXACT_REPRESENTATIONS = (serializers.Serializer.to_representation, FragmentCacheMixin.to_representation)
+
+
+class NotCompilable(Exception):
+    pass
+
+
+def _resolve_source(model, source):
+    """Walk a dotted source through forward foreign keys to a model field"""
+    parts = source.split('.')
+    for index, attr in enumerate(parts):
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            raise NotCompilable(f'{model.__name__}.{attr} is not a model field')
+        if index == len(parts) - 1:
+            return field
+        if not (field.many_to_one or field.one_to_one) or field.related_model is None or not field.concrete:
+            raise NotCompilable(f'{source} does not follow forward relations')
+        if field.null:
+            # DRF skips the key when an intermediate object is missing
+            raise NotCompilable(f'{source} crosses a nullable relation')
+        model = field.related_model
+
+
+def _compile_fields(serializer, model, prefix):
+    """Return [(key, kind, lookup, extra)] for a serializer"""
+    if type(serializer).to_representation not in EXACT_REPRESENTATIONS:
+        raise NotCompilable(f'{type(serializer).__name__} overrides to_representation')
+
+    plan = []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if field.source == '*' or isinstance(field, (
+            serializers.SerializerMethodField, serializers.ListSerializer,
+            serializers.ManyRelatedField, serializers.HiddenField,
+        )):
+            raise NotCompilable(f'{name} cannot be read from a values() row')
+
+        if isinstance(field, serializers.ModelSerializer):
+            relation = _resolve_source(model, field.source)
+            if not (relation.many_to_one or relation.one_to_one) or not relation.concrete:
+                raise NotCompilable(f'{name} is not a forward relation')
+            related = relation.related_model
+            lookup = prefix + field.source.replace('.', '__')
+            nested = _compile_fields(field, related, lookup + '__')
+            plan.append((name, 'nested', lookup + '__' + related._meta.pk.name, nested))
+            continue
+
+        if isinstance(field, serializers.BaseSerializer):
+            raise NotCompilable(f'{name} is not a ModelSerializer')
+
+        model_field = _resolve_source(model, field.source)
+        lookup = prefix + field.source.replace('.', '__')
+        if isinstance(field, serializers.RelatedField):
+            if not isinstance(field, serializers.PrimaryKeyRelatedField) or field.pk_field is not None:
+                raise NotCompilable(f'{name} needs the related object')
+            plan.append((name, 'pk', lookup, None))
+        elif type(field).get_attribute is not Field.get_attribute:
+            raise NotCompilable(f'{name} overrides get_attribute')
+        elif model_field.is_relation:
+            raise NotCompilable(f'{name} renders a related object')
+        elif isinstance(model_field, models.FileField):
+            plan.append((name, 'file', lookup, model_field))
+        else:
+            plan.append((name, 'value', lookup, model_field))
+    return plan
+
+
+def _lookups(plan):
+    for _, kind, lookup, extra in plan:
+        yield lookup
+        if kind == 'nested':
+            yield from _lookups(extra)
+
+
+class CompiledSerializer:
+    """Field plan of a ModelSerializer, built once and bound per request"""
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        self.model = serializer_class.Meta.model
+        self.plan = _compile_fields(serializer_class(), self.model, '')
+        # Cursor pagination reads the ordering fields from each row
+        self.ordering = tuple(field.lstrip('-') for field in keyset_ordering(self.model))
+        self.lookups = tuple(dict.fromkeys(tuple(_lookups(self.plan)) + self.ordering))
+
+    def values(self, queryset):
+        """The queryset's rows, as dicts holding every lookup the plan reads"""
+        return queryset.prefetch_related(None).values(*self.lookups)
+
+    def _bind(self, plan, fields):
+        bound = []
+        for key, kind, lookup, extra in plan:
+            field = fields[key]
+            if kind == 'nested':
+                bound.append((key, kind, lookup, self._bind(extra, field.fields)))
+            elif kind == 'pk':
+                bound.append((key, kind, lookup, None))
+            elif kind == 'file':
+                bound.append((key, kind, lookup, (field.to_representation, extra)))
+            else:
+                bound.append((key, kind, lookup, field.to_representation))
+        return bound
+
+    def _represent(self, row, bound, nested_cache):
+        ret = {}
+        for key, kind, lookup, extra in bound:
+            value = row[lookup]
+            if kind == 'nested':
+                if value is None:
+                    ret[key] = None
+                    continue
+                # Rows sharing a related object render it once per call
+                cache_key = (lookup, value)
+                nested = nested_cache.get(cache_key)
+                if nested is None:
+                    nested = nested_cache[cache_key] = self._represent(row, extra, nested_cache)
+                ret[key] = dict(nested)
+            elif value is None:
+                ret[key] = None
+            elif kind == 'pk':
+                ret[key] = value
+            elif kind == 'file':
+                to_representation, model_field = extra
+                ret[key] = to_representation(model_field.attr_class(None, model_field, value))
+            else:
+                ret[key] = extra(value)
+        return ret
+
+    def serialize(self, rows, context=None):
+        """Represent values() rows exactly as serializer_class(many=True).data would"""
+        bound = self._bind(self.plan, self.serializer_class(context=context or {}).fields)
+        nested_cache = {}
+        return [self._represent(row, bound, nested_cache) for row in rows]
+
+    def serialize_by_pk(self, queryset, context=None):
+        """{pk: data} for the rows of a queryset"""
+        pk_name = self.model._meta.pk.name
+        rows = list(queryset.prefetch_related(None).values(*dict.fromkeys(self.lookups + (pk_name,))))
+        return {row[pk_name]: data for row, data in zip(rows, self.serialize(rows, context))}
+
+
+@lru_cache(maxsize=512)
+def compile_serializer(serializer_class):
+    """CompiledSerializer for a ModelSerializer, or None if it cannot be compiled"""
+    if not issubclass(serializer_class, serializers.ModelSerializer):
+        return None
+    try:
+        return CompiledSerializer(serializer_class)
+    except NotCompilable:
+        return None
+
+
+DATABASE_JSON_COLUMN = '_json_row'
+
+
+class CompiledListMixin:
+    """
+    Serve the list action from values() rows when the serializer compiles
+
+    With ?render=db (JSON responses only), Postgres builds each row's JSON
+    and the rows are joined into the response without being decoded.
+    """
+
+    def get_output_serializer_class(self):
+        """Serializer class that renders responses; SparseFieldsMixin narrows it"""
+        return self.get_serializer_class()
+
+    def use_database_json(self, request):
+        return (
+            request.query_params.get('render') == 'db'
+            and getattr(request.accepted_renderer, 'format', None) == 'json'
+        )
+
+    def database_json_response(self, queryset, row, compiled):
+        queryset = queryset.prefetch_related(None).annotate(**{DATABASE_JSON_COLUMN: row})
+        queryset = queryset.values(DATABASE_JSON_COLUMN, *compiled.ordering)
+        page = self.paginate_queryset(queryset)
+        rows = page if page is not None else queryset
+        results = '[' + ','.join(item[DATABASE_JSON_COLUMN] for item in rows) + ']'
+
+        if page is None:
+            return HttpResponse(results, content_type='application/json')
+        # Render the pagination envelope around a placeholder, then splice the rows in
+        placeholder = uuid.uuid4().hex
+        envelope = ORJSONRenderer().render(self.get_paginated_response(placeholder).data)
+        content = envelope.replace(f'"{placeholder}"'.encode(), results.encode(), 1)
+        return HttpResponse(content, content_type='application/json')
+
+    def list(self, request, *args, **kwargs):
+        compiled = compile_serializer(self.get_output_serializer_class())
+        if compiled is None:
+            return super().list(request, *args, **kwargs)
+
+        if self.use_database_json(request):
+            row = database_json_row(compiled, self.get_serializer_context())
+            if row is not None:
+                return self.database_json_response(self.filter_queryset(self.get_queryset()), row, compiled)
+
+        queryset = compiled.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        rows = page if page is not None else queryset
+        data = compiled.serialize(rows, self.get_serializer_context())
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    async def alist(self, request, *args, **kwargs):
+        """list() for async views (core.async_views.AsyncReadMixin); ?render=db is not offered"""
+        compiled = compile_serializer(self.get_output_serializer_class())
+        if compiled is None:
+            return await super().alist(request, *args, **kwargs)
+
+        queryset = compiled.values(self.filter_queryset(self.get_queryset()))
+        page = await self.apaginate_queryset(queryset)
+        rows = page if page is not None else [row async for row in queryset]
+        data = compiled.serialize(rows, self.get_serializer_context())
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
@@ -0,0 +1,193 @@
+"""
+Conditional GET support (ETag / Last-Modified)
+
+List ETags are built from the cache versions (core.response_cache) of
+the listed model and of every related model the serializer renders,
+which saves and deletes bump after commit. Checking them costs a few
+cache reads and no query, and edits to a nested webinar or user change
+the ETag too. The versions are read before the list and the list is
+read from the primary, so a lagging replica can't pair a new version
+with an old body. Detail validators come from the object and its
+eager-loaded related objects. Requests whose If-None-Match or
+If-Modified-Since still match get a 304 before anything is serialized.
+
+Versions only mean something when every process shares the cache: with
+a per-process cache (no REDIS_URL) a worker that never sees a write
+never bumps them. Lists then get an ETag hashed from the rendered JSON
+body, which still spares the client the download.
+
+List responses only send an ETag: versions say that something changed,
+not when.
+"""
+import hashlib
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+from core.db_router import primary_reads
+from core.prefetch import eager_loading_lookups
+from core.renderers import ORJSONRenderer
+from core.response_cache import aresponse_cache_version, normalized_query, render_response, response_cache_version
+
+
+def has_updated_at(model):
+    return any(field.name == 'updated_at' for field in model._meta.concrete_fields)
+
+
+def make_etag(*parts):
+    return 'W/"%s"' % hashlib.md5('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def set_validators(response, etag, last_modified=None):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+
+
+def not_modified_response(request, etag, last_modified=None):
+    """The 304 (or 412) response the request's preconditions call for, or None"""
+    validators = HttpResponse()
+    set_validators(validators, etag, last_modified)
+    response = get_conditional_response(
+        request, etag, int(last_modified.timestamp()) if last_modified else None, validators
+    )
+    return None if response is validators else response
+
+
+def shared_cache():
+    """Whether all processes see the same default cache, and with it the same model versions"""
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def data_etag(data):
+    """ETag for a plain data payload, e.g. cached stats"""
+    return make_etag(hashlib.md5(ORJSONRenderer().render(data)).hexdigest())
+
+
+def _related_paths(serializer_class, model):
+    """select_related() paths of a serializer whose models have updated_at"""
+    paths = set()
+    for path in eager_loading_lookups(serializer_class)[0]:
+        parts = path.split('__')
+        for index in range(1, len(parts) + 1):
+            prefix = '__'.join(parts[:index])
+            related = model
+            for part in parts[:index]:
+                related = related._meta.get_field(part).related_model
+            if has_updated_at(related):
+                paths.add(prefix)
+    return sorted(paths)
+
+
+def _related_models(serializer_class, model):
+    """Models reached through a serializer's select_related() paths"""
+    models = set()
+    for path in eager_loading_lookups(serializer_class)[0]:
+        related = model
+        for part in path.split('__'):
+            related = related._meta.get_field(part).related_model
+            models.add(related)
+    return models
+
+
+class ConditionalGetMixin:
+    """Answer list and retrieve with 304 Not Modified when nothing changed"""
+
+    def validator_parts(self, request):
+        """What besides the data selects the representation"""
+        return (
+            self.action, request.user.pk, request.accepted_media_type,
+            request.path, normalized_query(request.query_params),
+        )
+
+    def list_models(self, model):
+        """Models whose writes can change the list: its own and every nested one"""
+        related = _related_models(self.get_serializer_class(), model) - {model}
+        return [model, *sorted(related, key=lambda related: related._meta.label_lower)]
+
+    def list_etag(self, request, model, versions):
+        return make_etag(model._meta.label_lower, *self.validator_parts(request), *versions)
+
+    def body_etag_response(self, request, response):
+        """Validate a rendered JSON list by a hash of its body"""
+        if response.status_code != 200 or getattr(request.accepted_renderer, 'format', None) != 'json':
+            return response
+        if isinstance(response, Response):
+            render_response(self, request, response)
+        etag = make_etag(hashlib.md5(response.content).hexdigest())
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+        set_validators(response, etag)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        model = self.get_queryset().model
+        if not has_updated_at(model):
+            return super().list(request, *args, **kwargs)
+        if not shared_cache():
+            return self.body_etag_response(request, super().list(request, *args, **kwargs))
+
+        versions = [response_cache_version(related) for related in self.list_models(model)]
+        etag = self.list_etag(request, model, versions)
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+        with primary_reads():
+            response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            set_validators(response, etag)
+        return response
+
+    async def alist(self, request, *args, **kwargs):
+        model = self.get_queryset().model
+        if not has_updated_at(model):
+            return await super().alist(request, *args, **kwargs)
+        if not shared_cache():
+            return self.body_etag_response(request, await super().alist(request, *args, **kwargs))
+
+        versions = [await aresponse_cache_version(related) for related in self.list_models(model)]
+        etag = self.list_etag(request, model, versions)
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+        with primary_reads():
+            response = await super().alist(request, *args, **kwargs)
+        if response.status_code == 200:
+            set_validators(response, etag)
+        return response
+
+    def object_validators(self, request, instance):
+        """(etag, last_modified) of an object and its eager-loaded related objects"""
+        stamps = [instance.updated_at]
+        for path in _related_paths(self.get_serializer_class(), type(instance)):
+            related = instance
+            for part in path.split('__'):
+                related = getattr(related, part, None) if related is not None else None
+            if related is not None:
+                stamps.append(related.updated_at)
+        etag = make_etag(instance._meta.label_lower, instance.pk, *self.validator_parts(request), *(
+            stamp.isoformat() for stamp in stamps
+        ))
+        return etag, max(stamps)
+
+    def object_response(self, request, instance):
+        if not has_updated_at(type(instance)):
+            return Response(self.get_serializer(instance).data)
+
+        etag, last_modified = self.object_validators(request, instance)
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        response = Response(self.get_serializer(instance).data)
+        set_validators(response, etag, last_modified)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.object_response(request, self.get_object())
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return self.object_response(request, await self.aget_object())
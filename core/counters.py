@@ -0,0 +1,277 @@
+"""
+Transactionally maintained registration counters
+
+Every counted model contributes +1 (and its amount, if any) to a 'total'
+bucket and to one '<field>:<value>' bucket per counted field. Saves and
+deletes apply the difference between the row's previous and new buckets
+with F() updates, inside the caller's transaction, so the dashboard can
+read the counts without scanning the registration tables.
+
+The same differences are applied to the DailyStatsRollup row of the day
+(in TIME_ZONE) each row was created on; see core.rollups.
+
+The difference is taken against the values the instance was loaded with,
+so views that change counted fields load the row with SELECT ... FOR
+UPDATE (CountedWriteMixin): a concurrent change of the same row commits
+first, and the row is then read with its committed values.
+"""
+from decimal import Decimal
+from django.db import connection, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.signals import post_init, post_save, post_delete
+from django.utils import timezone
+from users.models import User
+from webinars.models import WebinarRegistration
+from internships.models import InternshipRegistration
+from memberships.models import MembershipRegistration
+from core.models import StatsCounter, DailyStatsRollup
+
+
+TOTAL_BUCKET = 'total'
+
+# entity -> (model, counted fields, amount field, creation date field)
+COUNTED_MODELS = {
+    'webinar_registration': (WebinarRegistration, ('status', 'attended'), None, 'created_at'),
+    'internship_registration': (InternshipRegistration, ('status',), None, 'applied_at'),
+    'membership_registration': (
+        MembershipRegistration, ('status', 'payment_status'), 'payment_amount', 'created_at'
+    ),
+    'user': (User, (), None, 'created_at'),
+}
+
+ENTITY_BY_MODEL = {model: entity for entity, (model, _, _, _) in COUNTED_MODELS.items()}
+
+_SNAPSHOT_ATTR = '_counter_snapshot'
+
+
+def bucket_name(field, value):
+    return f'{field}:{value}'
+
+
+def _snapshot(instance):
+    """Current values of the counted fields, or None if any are deferred"""
+    _, fields, amount_field, date_field = COUNTED_MODELS[ENTITY_BY_MODEL[type(instance)]]
+    names = fields + ((amount_field,) if amount_field else ()) + (date_field,)
+    if any(name not in instance.__dict__ for name in names):
+        return None
+    return {name: instance.__dict__[name] for name in names}
+
+
+def _contributions(entity, values):
+    """Map each bucket a row with `values` belongs to onto its amount"""
+    _, fields, amount_field, _ = COUNTED_MODELS[entity]
+    amount = (values.get(amount_field) or Decimal('0')) if amount_field else Decimal('0')
+    buckets = {TOTAL_BUCKET: amount}
+    for field in fields:
+        buckets[bucket_name(field, values[field])] = amount
+    return buckets
+
+
+def _row_day(entity, values):
+    """Local creation date of a row, the day its rollup buckets belong to"""
+    created = values[COUNTED_MODELS[entity][3]]
+    return timezone.localdate(created) if created else timezone.localdate()
+
+
+def _apply(entity, old_values, new_values):
+    """Move a row's contribution from its old buckets to its new ones"""
+    deltas = {}
+    for values, sign in ((old_values, -1), (new_values, 1)):
+        if values is None:
+            continue
+        day = _row_day(entity, values)
+        for bucket, amount in _contributions(entity, values).items():
+            count, total = deltas.get((day, bucket), (0, Decimal('0')))
+            deltas[(day, bucket)] = (count + sign, total + sign * amount)
+
+    totals = {}
+    for (day, bucket), (count, amount) in deltas.items():
+        if count or amount:
+            increment_daily(day, entity, bucket, count, amount)
+        value, total = totals.get(bucket, (0, Decimal('0')))
+        totals[bucket] = (value + count, total + amount)
+
+    for bucket, (count, amount) in totals.items():
+        if count or amount:
+            increment(entity, bucket, count, amount)
+
+
+def increment(entity, bucket, count=1, amount=0):
+    """
+    Add to a counter with a single F() update
+
+    Counters are only created by rebuild_counters(); until an entity has
+    been built, increments are dropped rather than recorded as partial counts.
+    """
+    counters = StatsCounter.objects.filter(entity=entity)
+    updated = counters.filter(bucket=bucket).update(
+        value=F('value') + count, amount=F('amount') + amount
+    )
+    if not updated and counters.filter(bucket=TOTAL_BUCKET).exists():
+        # First row ever seen in this bucket
+        StatsCounter.objects.get_or_create(entity=entity, bucket=bucket)
+        counters.filter(bucket=bucket).update(
+            value=F('value') + count, amount=F('amount') + amount
+        )
+
+
+def lock_rollups(entity, shared=False):
+    """
+    Take a transaction-level advisory lock on an entity's rollup rows
+
+    Incremental updates share it; rebuild_rollups() takes it exclusively,
+    so it waits for writers in flight and holds new ones back until the
+    rebuilt rows are committed.
+    """
+    if connection.vendor != 'postgresql':
+        return
+    function = 'pg_advisory_xact_lock_shared' if shared else 'pg_advisory_xact_lock'
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {function}(hashtext(%s))", [f'daily-stats-rollup:{entity}'])
+
+
+@transaction.atomic
+def increment_daily(day, entity, bucket, count=1, amount=0):
+    """Add to a day's rollup row, creating it on the first change of the day"""
+    lock_rollups(entity, shared=True)
+    rollups = DailyStatsRollup.objects.filter(date=day, entity=entity, bucket=bucket)
+    updated = rollups.update(value=F('value') + count, amount=F('amount') + amount)
+    if not updated:
+        DailyStatsRollup.objects.get_or_create(date=day, entity=entity, bucket=bucket)
+        rollups.update(value=F('value') + count, amount=F('amount') + amount)
+
+
+def read_counters():
+    """
+    Return {entity: {bucket: {'value': int, 'amount': Decimal}}} in one query
+    Entities that were never built are rebuilt first.
+    """
+    counters = {}
+    for entity, bucket, value, amount in StatsCounter.objects.values_list(
+        'entity', 'bucket', 'value', 'amount'
+    ):
+        counters.setdefault(entity, {})[bucket] = {'value': value, 'amount': amount}
+
+    missing = [entity for entity in COUNTED_MODELS if TOTAL_BUCKET not in counters.get(entity, {})]
+    if missing:
+        for entity in missing:
+            rebuild_counters(entity)
+        return read_counters()
+    return counters
+
+
+def counter_value(counters, entity, bucket):
+    return counters.get(entity, {}).get(bucket, {}).get('value', 0)
+
+
+def counter_amount(counters, entity, bucket):
+    return counters.get(entity, {}).get(bucket, {}).get('amount', Decimal('0'))
+
+
+def compute_counters(entity):
+    """Recount an entity's buckets from its table: {bucket: (value, amount)}"""
+    model, fields, amount_field, _ = COUNTED_MODELS[entity]
+    amount = Sum(amount_field) if amount_field else None
+
+    def grouped(queryset):
+        if amount is None:
+            return queryset.annotate(value=Count('pk'))
+        return queryset.annotate(value=Count('pk'), amount=amount)
+
+    total = model.objects.aggregate(value=Count('pk'), **({'amount': amount} if amount else {}))
+    computed = {TOTAL_BUCKET: (total['value'], total.get('amount') or Decimal('0'))}
+    for field in fields:
+        for row in grouped(model.objects.order_by().values(field)):
+            computed[bucket_name(field, row[field])] = (row['value'], row.get('amount') or Decimal('0'))
+
+    # Keep a zero row for every declared choice so increments never need to create one
+    for field in fields:
+        for value, _ in model._meta.get_field(field).choices or ():
+            computed.setdefault(bucket_name(field, value), (0, Decimal('0')))
+    return computed
+
+
+@transaction.atomic
+def rebuild_counters(entity, dry_run=False):
+    """
+    Recompute an entity's counters from scratch and return the drift found
+    as {bucket: (stored, actual)}
+
+    Existing counter rows are locked before counting, so concurrent writers
+    wait and then apply their increments on top of the rebuilt values.
+    """
+    stored = {
+        counter.bucket: counter
+        for counter in StatsCounter.objects.select_for_update().filter(entity=entity)
+    }
+    computed = compute_counters(entity)
+
+    drift = {}
+    for bucket in set(stored) | set(computed):
+        counter = stored.get(bucket)
+        value, amount = computed.get(bucket, (0, Decimal('0')))
+        if counter is None or counter.value != value or counter.amount != amount:
+            drift[bucket] = (counter.value if counter else None, value)
+            if dry_run:
+                continue
+            if counter is None:
+                StatsCounter.objects.create(entity=entity, bucket=bucket, value=value, amount=amount)
+            else:
+                counter.value = value
+                counter.amount = amount
+                counter.save(update_fields=['value', 'amount', 'updated_at'])
+    return drift
+
+
+class CountedWriteMixin:
+    """
+    Lock the row in the viewset actions that can move it between buckets
+    Actions listed in locked_actions must run inside a transaction.
+    """
+    locked_actions = ('update', 'partial_update', 'destroy', 'change_status')
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action in self.locked_actions:
+            queryset = queryset.select_for_update(of=('self',))
+        return queryset
+
+    @transaction.atomic
+    def update(self, request, *args, **kwargs):
+        return super().update(request, *args, **kwargs)
+
+    @transaction.atomic
+    def destroy(self, request, *args, **kwargs):
+        return super().destroy(request, *args, **kwargs)
+
+
+def snapshot_counted_fields(sender, instance, **kwargs):
+    setattr(instance, _SNAPSHOT_ATTR, _snapshot(instance))
+
+
+def count_saved_registration(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    entity = ENTITY_BY_MODEL[sender]
+    new_values = _snapshot(instance)
+    if created:
+        _apply(entity, None, new_values)
+    else:
+        old_values = getattr(instance, _SNAPSHOT_ATTR, None)
+        if old_values is not None and old_values != new_values:
+            _apply(entity, old_values, new_values)
+    setattr(instance, _SNAPSHOT_ATTR, new_values)
+
+
+def count_deleted_registration(sender, instance, **kwargs):
+    entity = ENTITY_BY_MODEL[sender]
+    old_values = getattr(instance, _SNAPSHOT_ATTR, None) or _snapshot(instance)
+    _apply(entity, old_values, None)
+
+
+def connect_counter_signals():
+    for model in ENTITY_BY_MODEL:
+        label = model._meta.label
+        post_init.connect(snapshot_counted_fields, sender=model, dispatch_uid=f'counters-init-{label}')
+        post_save.connect(count_saved_registration, sender=model, dispatch_uid=f'counters-save-{label}')
+        post_delete.connect(count_deleted_registration, sender=model, dispatch_uid=f'counters-delete-{label}')
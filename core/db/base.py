@@ -0,0 +1,32 @@
+"""
+PostgreSQL backend that times new connections for core.db_metrics
+
+Apart from the timing it is Django's postgresql backend. With
+PGBOUNCER_TRANSACTION_POOLING it also warns when Django has to change the
+connection's time zone, since that SET only reaches one server connection.
+"""
+import logging
+import time
+from django.conf import settings
+from django.db.backends.postgresql import base
+from core.db_metrics import record_connect
+
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        record_connect(self, time.perf_counter() - started)
+
+    def ensure_timezone(self):
+        changed = super().ensure_timezone()
+        if changed and settings.PGBOUNCER_TRANSACTION_POOLING:
+            logger.warning(
+                "Sent SET TIME ZONE %s through PgBouncer transaction pooling; set the database "
+                "role's timezone instead (ALTER ROLE ... SET timezone TO %r)",
+                self.timezone_name, self.timezone_name,
+            )
+        return changed
@@ -0,0 +1,108 @@
+"""
+Database connection metrics
+
+The core.db backend records every new connection and how long it took to
+open (TCP, TLS, auth and Django's connection setup). The middleware
+counts the requests that ended with a database connection, and how many
+of them reused one that was already open; requests that opened one get a
+`Server-Timing: db-connect;dur=<ms>` header. Counts are kept per process
+and added to cache counters every FLUSH_INTERVAL seconds, so
+`manage.py db_connection_stats` reports all workers together.
+
+Under ASGI, requests handled in async mode run their queries on other
+threads' connections, so only connects are counted for them.
+"""
+import threading
+import time
+from collections import Counter
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.cache import cache
+from django.db import connection
+
+
+FLUSH_INTERVAL = 10  # seconds
+
+METRIC_NAMES = ('requests', 'reused', 'connects', 'connect_us')
+
+_lock = threading.Lock()
+_pending = Counter()
+_flushed_at = time.monotonic()
+
+
+def _metric_key(name):
+    return f'db-metrics:{name}'
+
+
+def record_connect(wrapper, seconds):
+    """Called by the core.db backend after opening a connection"""
+    wrapper.connects = getattr(wrapper, 'connects', 0) + 1
+    wrapper.connect_seconds = getattr(wrapper, 'connect_seconds', 0.0) + seconds
+    _count(connects=1, connect_us=round(seconds * 1_000_000))
+
+
+def _count(**counts):
+    global _flushed_at
+    now = time.monotonic()
+    with _lock:
+        _pending.update(counts)
+        if now - _flushed_at < FLUSH_INTERVAL:
+            return
+        _flushed_at = now
+        counters = dict(_pending)
+        _pending.clear()
+    flush(counters)
+
+
+def flush(counters):
+    for name, value in counters.items():
+        if not value:
+            continue
+        try:
+            cache.incr(_metric_key(name), value)
+        except ValueError:
+            if not cache.add(_metric_key(name), value, timeout=None):
+                cache.incr(_metric_key(name), value)
+
+
+def connection_stats():
+    """Totals flushed by every process, including this one's pending counts"""
+    with _lock:
+        counters = dict(_pending)
+        _pending.clear()
+    flush(counters)
+    totals = cache.get_many([_metric_key(name) for name in METRIC_NAMES])
+    return {name: totals.get(_metric_key(name), 0) for name in METRIC_NAMES}
+
+
+def reset_connection_stats():
+    with _lock:
+        _pending.clear()
+    cache.delete_many([_metric_key(name) for name in METRIC_NAMES])
+
+
+class DatabaseConnectionMetricsMiddleware:
+    """Count connection reuse per request and report new connections in Server-Timing"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.get_response(request)
+
+        connects = getattr(connection, 'connects', 0)
+        connect_seconds = getattr(connection, 'connect_seconds', 0.0)
+        response = self.get_response(request)
+
+        opened = getattr(connection, 'connects', 0) - connects
+        if opened:
+            duration = (getattr(connection, 'connect_seconds', 0.0) - connect_seconds) * 1000
+            response['Server-Timing'] = f'db-connect;dur={duration:.1f}'
+            _count(requests=1)
+        elif connection.connection is not None:
+            _count(requests=1, reused=1)
+        return response
@@ -0,0 +1,197 @@
+"""
+Read-replica routing
+
+ReplicaRoutingMiddleware sends the reads of GET/HEAD/OPTIONS requests to
+a replica from DATABASE_REPLICA_URLS; writes, reads inside a transaction
+and every query of other requests use the primary. Replicas more than
+REPLICA_MAX_LAG seconds behind (checked at most every
+REPLICA_LAG_CHECK_INTERVAL seconds per process) or unreachable are
+skipped, and with none left reads go to the primary.
+
+After a successful write the response sets a `db_primary_until` cookie
+and an X-DB-Primary-Until header. Requests that send either back before
+that time read from the primary, so clients see their own writes.
+
+Code outside requests (Celery tasks, commands) reads from the primary
+unless it runs inside replica_reads().
+
+The middleware also runs in async mode under ASGI, where only the
+periodic lag check is sent to a thread.
+"""
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+
+
+PRIMARY_UNTIL_COOKIE = 'db_primary_until'
+PRIMARY_UNTIL_HEADER = 'X-DB-Primary-Until'
+
+# 0 when the replica has replayed everything it received, else the age of the last replayed transaction
+LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+_read_database = ContextVar('read_database', default=None)
+
+
+def replica_lag(alias):
+    """Seconds a replica is behind, or None if it cannot be reached"""
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute(LAG_QUERY)
+            return float(cursor.fetchone()[0])
+    except DatabaseError:
+        return None
+
+
+class ReplicaHealth:
+    """Per-process list of replicas within REPLICA_MAX_LAG, refreshed periodically"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checked_at = None
+        self._healthy = []
+
+    def due(self):
+        """Whether the next healthy() call will query the replicas"""
+        checked_at = self._checked_at
+        return checked_at is None or time.monotonic() - checked_at >= settings.REPLICA_LAG_CHECK_INTERVAL
+
+    def healthy(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < settings.REPLICA_LAG_CHECK_INTERVAL:
+                return self._healthy
+            # Other threads keep using the previous list while this one checks
+            self._checked_at = now
+
+        healthy = []
+        for alias in settings.DATABASE_REPLICAS:
+            lag = replica_lag(alias)
+            if lag is not None and lag <= settings.REPLICA_MAX_LAG:
+                healthy.append(alias)
+        self._healthy = healthy
+        return healthy
+
+
+replica_health = ReplicaHealth()
+
+
+def choose_replica():
+    """A healthy replica alias, or None to read from the primary"""
+    if not settings.DATABASE_REPLICAS:
+        return None
+    healthy = replica_health.healthy()
+    return random.choice(healthy) if healthy else None
+
+
+@contextmanager
+def replica_reads():
+    """Send reads in the block to a replica, e.g. in a read-only Celery task"""
+    token = _read_database.set(choose_replica())
+    try:
+        yield
+    finally:
+        _read_database.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """Send reads in the block to the primary"""
+    token = _read_database.set(None)
+    try:
+        yield
+    finally:
+        _read_database.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        alias = _read_database.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        # Explicit, or instances read from a replica would be saved back to it
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def _primary_until(request):
+    """The end of the client's read-your-writes window, if it sent one"""
+    value = request.headers.get(PRIMARY_UNTIL_HEADER) or request.COOKIES.get(PRIMARY_UNTIL_COOKIE)
+    try:
+        until = float(value)
+    except (TypeError, ValueError):
+        return None
+    # Ignore windows longer than the server would have set
+    return min(until, time.time() + settings.REPLICA_STICKY_SECONDS)
+
+
+class ReplicaRoutingMiddleware:
+    """Route the reads of safe-method requests to a replica"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def reads_from_replica(self, request):
+        if request.method not in SAFE_METHODS:
+            return False
+        until = _primary_until(request)
+        return until is None or until <= time.time()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        alias = choose_replica() if self.reads_from_replica(request) else None
+        token = _read_database.set(alias)
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_database.reset(token)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        alias = None
+        if self.reads_from_replica(request):
+            if settings.DATABASE_REPLICAS and replica_health.due():
+                alias = await sync_to_async(choose_replica)()
+            else:
+                alias = choose_replica()
+
+        token = _read_database.set(alias)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_database.reset(token)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if request.method not in SAFE_METHODS and response.status_code < 400 and settings.DATABASE_REPLICAS:
+            until = str(int(time.time()) + settings.REPLICA_STICKY_SECONDS)
+            response.set_cookie(
+                PRIMARY_UNTIL_COOKIE, until, max_age=settings.REPLICA_STICKY_SECONDS,
+                secure=request.is_secure(), httponly=True, samesite='Lax',
+            )
+            response[PRIMARY_UNTIL_HEADER] = until
+        return response
@@ -0,0 +1,152 @@
+"""
+Publish/subscribe channel for live dashboard statistics
+
+Registration viewsets publish small stat deltas (a new registration, a
+status change, a completed payment) once their transaction commits, and
+the stats stream relays them to connected dashboards. Events go through
+Redis pub/sub when REDIS_URL is set, so every worker sees them, and
+through an in-process channel otherwise.
+
+A broker's subscribe() is an async context manager yielding
+receive(timeout), which returns the next message, or None once `timeout`
+seconds pass without one; the subscription stays open either way.
+"""
+import asyncio
+import json
+import threading
+from contextlib import asynccontextmanager
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+
+STATS_EVENTS_CHANNEL = 'stats:events'
+
+
+class LocalBroker:
+    """Fan out messages to the asyncio queues of subscribers in this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+
+    def publish(self, message):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, message)
+
+    @asynccontextmanager
+    async def subscribe(self):
+        """Subscribe for the duration of the block; yields receive(timeout)"""
+        queue = asyncio.Queue()
+        subscriber = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._subscribers.add(subscriber)
+
+        async def receive(timeout):
+            # Cancelling a pending get() leaves the queue and the subscription intact
+            try:
+                return await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                return None
+
+        try:
+            yield receive
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscriber)
+
+
+class RedisBroker:
+    """Relay messages through a Redis pub/sub channel shared by all workers"""
+
+    def __init__(self, url):
+        # Imported here so processes without REDIS_URL never load redis
+        import redis
+
+        self.url = url
+        self._client = redis.Redis.from_url(url)
+
+    def publish(self, message):
+        self._client.publish(STATS_EVENTS_CHANNEL, message)
+
+    @asynccontextmanager
+    async def subscribe(self):
+        """Subscribe for the duration of the block; yields receive(timeout)"""
+        import redis.asyncio
+
+        client = redis.asyncio.Redis.from_url(self.url)
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(STATS_EVENTS_CHANNEL)
+        loop = asyncio.get_running_loop()
+
+        async def receive(timeout):
+            deadline = loop.time() + timeout
+            while True:
+                # Returns None early for skipped subscribe confirmations, so poll until the deadline
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=max(deadline - loop.time(), 0)
+                )
+                if message is not None:
+                    return message['data'].decode()
+                if loop.time() >= deadline:
+                    return None
+
+        try:
+            yield receive
+        finally:
+            await pubsub.unsubscribe(STATS_EVENTS_CHANNEL)
+            await pubsub.close()
+            await client.close()
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = RedisBroker(settings.REDIS_URL) if settings.REDIS_URL else LocalBroker()
+    return _broker
+
+
+def publish_stats_event(event, **data):
+    """Publish an event once the current transaction commits"""
+    message = json.dumps({'event': event, **data}, cls=DjangoJSONEncoder)
+    transaction.on_commit(lambda: get_broker().publish(message))
+
+
+def publish_registration_created(type_name, registration):
+    deltas = {'total': 1, f'status:{registration.status}': 1}
+    payment_status = getattr(registration, 'payment_status', None)
+    if payment_status:
+        deltas[f'payment_status:{payment_status}'] = 1
+    if payment_status == 'completed':
+        deltas['revenue'] = float(registration.payment_amount or 0)
+    publish_stats_event(
+        'registration_created', type=type_name, id=registration.id, deltas=deltas
+    )
+
+
+def publish_status_changed(type_name, registration, old_status):
+    if registration.status == old_status:
+        return
+    publish_stats_event(
+        'registration_status_changed', type=type_name, id=registration.id,
+        deltas={f'status:{old_status}': -1, f'status:{registration.status}': 1},
+    )
+
+
+def publish_payment_completed(registration, old_payment_status):
+    """Publish a membership payment that moved to completed"""
+    if registration.payment_status != 'completed' or old_payment_status == 'completed':
+        return
+    publish_stats_event(
+        'payment_completed', type='membership', id=registration.id,
+        deltas={
+            f'payment_status:{old_payment_status}': -1,
+            'payment_status:completed': 1,
+            'revenue': float(registration.payment_amount or 0),
+        },
+    )
@@ -0,0 +1,134 @@
+"""
+Per-object fragment cache for serializer output
+
+FragmentCacheMixin caches a serializer's to_representation() per object
+under a key made of the serializer (class and rendered field names), the
+model, the pk, the object's updated_at and the request origin used for
+absolute file URLs. An edit moves updated_at and with it the key, so a
+stale fragment is never read; old fragments expire through
+FRAGMENT_CACHE_TIMEOUT. Rows changed through queryset.update() without
+touching updated_at are not detected.
+
+File and image URLs are left out of the cached fragment and rendered on
+every use: with S3 query string auth they are signed and expire, and the
+key does not change when they do.
+
+FragmentListSerializer fetches the fragments of a whole page, for the
+child itself or for its nested fragment-cached fields, with one
+cache.get_many() and stores the misses with one set_many().
+
+Compiled list serialization (core.compiled_serializers) renders nested
+objects from the joined values() row and does not consult the cache.
+"""
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import models
+from rest_framework import serializers
+from rest_framework.fields import SkipField
+
+
+def _namespace(serializer):
+    cls = type(serializer)
+    fields = ','.join(f'{name}:{type(field).__name__}' for name, field in serializer.fields.items())
+    return f'{cls.__module__}.{cls.__qualname__}({fields})'
+
+
+def _origin(serializer):
+    request = serializer.context.get('request')
+    return request.build_absolute_uri('/') if request is not None else ''
+
+
+class FragmentCacheMixin:
+    """Cache to_representation() per object, keyed on its updated_at"""
+
+    def fragment_key(self, instance):
+        """Cache key of an object's representation, or None when it cannot be cached"""
+        if getattr(instance, 'pk', None) is None or 'updated_at' in instance.get_deferred_fields():
+            return None
+        updated_at = getattr(instance, 'updated_at', None)
+        if updated_at is None:
+            return None
+        parts = (_namespace(self), instance._meta.label_lower, instance.pk, updated_at.isoformat(), _origin(self))
+        return 'fragment:' + hashlib.md5('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+    def file_fields(self):
+        return [
+            field for field in self.fields.values()
+            if isinstance(field, serializers.FileField) and not field.write_only
+        ]
+
+    def render_fragment(self, instance):
+        """The cacheable representation: file URLs are blanked, to be filled in per use"""
+        data = super().to_representation(instance)
+        for field in self.file_fields():
+            if field.field_name in data:
+                data[field.field_name] = None
+        return data
+
+    def add_file_urls(self, instance, data):
+        for field in self.file_fields():
+            if field.field_name in data:
+                attribute = field.get_attribute(instance)
+                data[field.field_name] = None if attribute is None else field.to_representation(attribute)
+        return data
+
+    def to_representation(self, instance):
+        key = self.fragment_key(instance)
+        if key is None:
+            return super().to_representation(instance)
+
+        fragments = getattr(self.root, '_fragments', None)
+        if fragments is not None and key in fragments:
+            return self.add_file_urls(instance, dict(fragments[key]))
+        data = cache.get(key)
+        if data is None:
+            data = self.render_fragment(instance)
+            cache.set(key, data, settings.FRAGMENT_CACHE_TIMEOUT)
+        return self.add_file_urls(instance, dict(data))
+
+
+def _fragment_targets(child, instances):
+    """{key: (serializer, instance)} for the fragments a page of rows renders"""
+    targets = {}
+    if isinstance(child, FragmentCacheMixin):
+        for instance in instances:
+            key = child.fragment_key(instance)
+            if key is not None:
+                targets[key] = (child, instance)
+        return targets
+
+    nested = [
+        field for field in child.fields.values()
+        if isinstance(field, FragmentCacheMixin) and not field.write_only
+    ]
+    for field in nested:
+        for instance in instances:
+            try:
+                related = field.get_attribute(instance)
+            except (AttributeError, KeyError, ObjectDoesNotExist, SkipField):
+                continue
+            key = field.fragment_key(related) if related is not None else None
+            if key is not None:
+                targets[key] = (field, related)
+    return targets
+
+
+class FragmentListSerializer(serializers.ListSerializer):
+    """ListSerializer that loads the fragments of a page in one get_many()"""
+
+    def to_representation(self, data):
+        instances = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        targets = _fragment_targets(self.child, instances)
+        if targets:
+            fragments = cache.get_many(list(targets))
+            missing = {
+                key: serializer.render_fragment(instance)
+                for key, (serializer, instance) in targets.items()
+                if key not in fragments
+            }
+            if missing:
+                cache.set_many(missing, settings.FRAGMENT_CACHE_TIMEOUT)
+            self._fragments = {**fragments, **missing}
+        return super().to_representation(instances)
@@ -0,0 +1,141 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import httpx
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import RefreshToken
+from users.models import User
+
+
+DEFAULT_PATHS = [
+    '/api/v1/webinars/list/',
+    '/api/v1/internships/list/',
+    '/api/v1/memberships/list/',
+    '/api/v1/stats/dashboard/',
+    '/api/v1/stats/comprehensive/',
+]
+
+STAFF_PATH_PREFIX = '/api/v1/stats/'
+
+
+def server_command(server, port, workers):
+    if server == 'gunicorn':
+        return [
+            sys.executable, '-m', 'gunicorn', 'liture.wsgi:application',
+            '--workers', str(workers), '--bind', f'127.0.0.1:{port}',
+        ]
+    return [
+        sys.executable, '-m', 'uvicorn', 'liture.asgi:application',
+        '--workers', str(workers), '--host', '127.0.0.1', '--port', str(port), '--no-access-log',
+    ]
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the catalog and stats endpoints under gunicorn sync workers and under uvicorn "
+        "with ASYNC_VIEWS, and compare throughput and latency"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help="Worker processes per server")
+        parser.add_argument('--concurrency', type=int, default=50, help="Requests in flight")
+        parser.add_argument('--requests', type=int, default=2000, help="Requests per server")
+        parser.add_argument('--port', type=int, default=8700, help="Port of the first server; the second uses the next one")
+        parser.add_argument('--host', default='localhost', help="Host header, must be in ALLOWED_HOSTS")
+        parser.add_argument('--paths', nargs='+', default=DEFAULT_PATHS, help="Paths requested in turn")
+        parser.add_argument(
+            '--cold', action='store_true',
+            help="Add a unique query parameter to every request so catalog responses miss the cache",
+        )
+
+    def handle(self, *args, **options):
+        if min(options['workers'], options['concurrency'], options['requests']) < 1:
+            raise CommandError("--workers, --concurrency and --requests must be positive")
+
+        staff = User.objects.filter(is_staff=True, is_active=True).first()
+        if staff is None and any(path.startswith(STAFF_PATH_PREFIX) for path in options['paths']):
+            raise CommandError("The stats endpoints need an active staff user to authenticate as")
+        token = str(RefreshToken.for_user(staff).access_token) if staff else None
+
+        for offset, (label, server, async_views) in enumerate((
+            ('gunicorn sync workers', 'gunicorn', False),
+            ('uvicorn + async views', 'uvicorn', True),
+        )):
+            port = options['port'] + offset
+            env = {**os.environ, 'ASYNC_VIEWS': str(async_views)}
+            process = subprocess.Popen(
+                server_command(server, port, options['workers']), env=env, cwd=settings.BASE_DIR,
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            try:
+                result = asyncio.run(self.run_load(port, token, options))
+            finally:
+                process.terminate()
+                process.wait()
+            self.report(label, result)
+
+    async def run_load(self, port, token, options):
+        paths = options['paths']
+        latencies = []
+        errors = 0
+        pending = iter(range(options['requests']))
+
+        def headers(path):
+            auth = {'Authorization': f'Bearer {token}'} if token and path.startswith(STAFF_PATH_PREFIX) else {}
+            return {'Host': options['host'], **auth}
+
+        async with httpx.AsyncClient(
+            base_url=f'http://127.0.0.1:{port}', timeout=30,
+            limits=httpx.Limits(max_connections=options['concurrency']),
+        ) as client:
+            await self.wait_until_up(client, paths[0], headers(paths[0]))
+            # Fill the caches so both servers are measured warm
+            for path in paths:
+                await client.get(path, headers=headers(path))
+
+            async def worker():
+                nonlocal errors
+                for index in pending:
+                    path = paths[index % len(paths)]
+                    if options['cold']:
+                        path = f"{path}{'&' if '?' in path else '?'}bench={index}"
+                    started = time.perf_counter()
+                    try:
+                        response = await client.get(path, headers=headers(path))
+                        failed = response.status_code >= 400
+                    except httpx.HTTPError:
+                        failed = True
+                    latencies.append(time.perf_counter() - started)
+                    errors += failed
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(options['concurrency'])))
+            elapsed = time.perf_counter() - started
+        return sorted(latencies), errors, elapsed
+
+    async def wait_until_up(self, client, path, headers, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                await client.get(path, headers=headers)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+        raise CommandError(f"Server on {client.base_url} did not start within {timeout}s")
+
+    def report(self, label, result):
+        latencies, errors, elapsed = result
+        self.stdout.write(
+            f"{label}: {len(latencies) / elapsed:.0f} req/s, "
+            f"p50 {percentile(latencies, 0.5) * 1000:.1f} ms, "
+            f"p95 {percentile(latencies, 0.95) * 1000:.1f} ms, "
+            f"p99 {percentile(latencies, 0.99) * 1000:.1f} ms, "
+            f"errors {errors}"
+        )
@@ -0,0 +1,54 @@
+import io
+from django.core.management.base import CommandError
+from django.db import transaction
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from webinars.serializers import WebinarRegistrationListSerializer
+from memberships.serializers import MembershipRegistrationListSerializer
+from core.compiled_serializers import compile_serializer
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+from core.stats import get_dashboard_stats
+from core.management.commands.benchmark_list_serializers import Command as ListBenchmarkCommand, Rollback
+
+
+class Command(ListBenchmarkCommand):
+    help = (
+        "Compare DRF's JSONRenderer/JSONParser with the orjson pair on registration list payloads. "
+        "Rows are created inside a transaction that is rolled back afterwards."
+    )
+
+    def handle(self, *args, **options):
+        if options['rows'] < 1 or options['repeat'] < 1:
+            raise CommandError("--rows and --repeat must be positive")
+        try:
+            with transaction.atomic():
+                self.seed(options['rows'])
+                context = {'request': Request(APIRequestFactory().get('/'))}
+                for serializer_class in (WebinarRegistrationListSerializer, MembershipRegistrationListSerializer):
+                    compiled = compile_serializer(serializer_class)
+                    queryset = serializer_class.Meta.model.objects.filter(user__name__startswith='Bench ')
+                    data = {'count': queryset.count(), 'results': compiled.serialize(compiled.values(queryset), context)}
+                    self.compare_json(serializer_class.__name__, data, options['repeat'])
+                # Raw Decimal, date and datetime values go through the encoder fallbacks
+                self.compare_json('get_dashboard_stats', get_dashboard_stats(), options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def compare_json(self, label, data, repeat):
+        stdlib_time, stdlib_json = self.timed(lambda: JSONRenderer().render(data), repeat)
+        orjson_time, orjson_json = self.timed(lambda: ORJSONRenderer().render(data), repeat)
+        stdlib_parse, stdlib_data = self.timed(lambda: JSONParser().parse(io.BytesIO(stdlib_json)), repeat)
+        orjson_parse, orjson_data = self.timed(lambda: ORJSONParser().parse(io.BytesIO(stdlib_json)), repeat)
+
+        self.stdout.write(
+            f"{label}: {len(stdlib_json) / 1024:.0f} KB, "
+            f"render {stdlib_time * 1000:.1f} ms -> {orjson_time * 1000:.1f} ms ({stdlib_time / orjson_time:.1f}x), "
+            f"parse {stdlib_parse * 1000:.1f} ms -> {orjson_parse * 1000:.1f} ms ({stdlib_parse / orjson_parse:.1f}x), "
+            f"identical bytes: {stdlib_json == orjson_json}"
+        )
+        if stdlib_json != orjson_json or stdlib_data != orjson_data:
+            raise CommandError(f"{label} output differs")
@@ -0,0 +1,98 @@
+import time
+import uuid
+from datetime import date
+from decimal import Decimal
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from users.models import User
+from webinars.models import Webinar, WebinarRegistration
+from webinars.serializers import WebinarRegistrationListSerializer
+from memberships.models import Membership, MembershipRegistration
+from memberships.serializers import MembershipRegistrationListSerializer
+from core.compiled_serializers import compile_serializer
+from core.prefetch import eager_load
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare DRF and compiled list serialization on synthetic registrations. "
+        "Rows are created inside a transaction that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help="Registrations per model (default: 10000)")
+        parser.add_argument('--repeat', type=int, default=3, help="Runs per measurement; the best is reported")
+
+    def handle(self, *args, **options):
+        if options['rows'] < 1 or options['repeat'] < 1:
+            raise CommandError("--rows and --repeat must be positive")
+        try:
+            with transaction.atomic():
+                self.seed(options['rows'])
+                for serializer_class in (WebinarRegistrationListSerializer, MembershipRegistrationListSerializer):
+                    self.compare(serializer_class, options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, rows):
+        tag = uuid.uuid4().hex[:8]
+        User.objects.bulk_create(
+            User(name=f'Bench {i}', email=f'bench-{tag}-{i}@example.com', phone_number=f'b{tag}{i}')
+            for i in range(rows)
+        )
+        users = User.objects.filter(email__startswith=f'bench-{tag}-')
+        webinar = Webinar.objects.create(
+            title='Benchmark webinar', description='x' * 500, event_date=date.today(), image='webinars/bench.png'
+        )
+        membership = Membership.objects.create(
+            name=f'Benchmark {tag}', description='x' * 500, benefits=['One', 'Two', 'Three']
+        )
+        WebinarRegistration.objects.bulk_create(
+            WebinarRegistration(webinar=webinar, user=user, reason='Interested') for user in users
+        )
+        MembershipRegistration.objects.bulk_create(
+            MembershipRegistration(
+                membership=membership, user=user, payment_status='completed', payment_amount=Decimal('49.00')
+            )
+            for user in users
+        )
+
+    def timed(self, func, repeat):
+        best, result = None, None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    def compare(self, serializer_class, repeat):
+        queryset = serializer_class.Meta.model.objects.filter(user__name__startswith='Bench ')
+        context = {'request': Request(APIRequestFactory().get('/'))}
+        compiled = compile_serializer(serializer_class)
+        if compiled is None:
+            raise CommandError(f"{serializer_class.__name__} does not compile")
+        renderer = JSONRenderer()
+
+        drf_time, drf_json = self.timed(lambda: renderer.render(
+            serializer_class(eager_load(queryset, serializer_class), many=True, context=context).data
+        ), repeat)
+        fast_time, fast_json = self.timed(lambda: renderer.render(
+            compiled.serialize(compiled.values(queryset), context)
+        ), repeat)
+
+        self.stdout.write(
+            f"{serializer_class.__name__}: {queryset.count()} rows, "
+            f"DRF {drf_time * 1000:.0f} ms, compiled {fast_time * 1000:.0f} ms "
+            f"({drf_time / fast_time:.1f}x), identical JSON: {drf_json == fast_json}"
+        )
+        if drf_json != fast_json:
+            raise CommandError(f"{serializer_class.__name__} output differs")
@@ -0,0 +1,23 @@
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from core.tiered_cache import TieredRedisCache
+
+
+class Command(BaseCommand):
+    help = "Show hit/miss counts of the in-process and Redis cache tiers, summed over all workers"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help="Reset the counts after showing them")
+
+    def handle(self, *args, **options):
+        cache = caches['default']
+        if not isinstance(cache, TieredRedisCache):
+            raise CommandError("The default cache is not a TieredRedisCache; set REDIS_URL")
+
+        for tier, counts in cache.cluster_tier_stats().items():
+            lookups = counts['hits'] + counts['misses']
+            ratio = f"{counts['hits'] / lookups:.1%}" if lookups else "n/a"
+            self.stdout.write(f"{tier}: {counts['hits']} hits, {counts['misses']} misses, hit ratio {ratio}")
+        if options['reset']:
+            cache.reset_tier_stats()
+            self.stdout.write(self.style.SUCCESS("Counts reset"))
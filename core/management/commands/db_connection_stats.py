@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from core.db_metrics import connection_stats, reset_connection_stats
+
+
+class Command(BaseCommand):
+    help = "Show database connection reuse and connect time, summed over all workers"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help="Reset the counts after showing them")
+
+    def handle(self, *args, **options):
+        stats = connection_stats()
+        requests, connects = stats['requests'], stats['connects']
+        reuse = f"{stats['reused'] / requests:.1%}" if requests else "n/a"
+        connect_ms = f"{stats['connect_us'] / connects / 1000:.1f} ms" if connects else "n/a"
+        self.stdout.write(f"Requests using the database: {requests}, reused an open connection: {reuse}")
+        self.stdout.write(f"Connections opened: {connects}, average connect time: {connect_ms}")
+        if options['reset']:
+            reset_connection_stats()
+            self.stdout.write(self.style.SUCCESS("Counts reset"))
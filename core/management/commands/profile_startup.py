@@ -0,0 +1,81 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.startup import DEFAULT_PATH, package_totals, parse_importtime
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the cold start of WSGI entry points, each in fresh interpreters, "
+        "and report which packages and modules their imports spend the time in"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--entries', nargs='+', default=['liture.wsgi', 'liture.serverless'],
+            help="Entry point modules to compare; the first one is the baseline",
+        )
+        parser.add_argument('--runs', type=int, default=5, help="Cold starts per entry point; medians are reported")
+        parser.add_argument('--path', default=DEFAULT_PATH, help="Path of the first request")
+        parser.add_argument('--top', type=int, default=10, help="Packages and modules listed per entry point")
+
+    def handle(self, *args, **options):
+        if options['runs'] < 1 or options['top'] < 1:
+            raise CommandError("--runs and --top must be positive")
+
+        totals = {}
+        for entry in options['entries']:
+            runs = [self.cold_start(entry, options['path']) for _ in range(options['runs'])]
+            last, _ = runs[-1]
+            import_ms = statistics.median(result['import_ms'] for result, _ in runs)
+            request_ms = statistics.median(result['request_ms'] for result, _ in runs)
+            totals[entry] = statistics.median(total for _, total in runs)
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{entry} ({last['status']})"))
+            self.stdout.write(
+                f"  cold start {totals[entry]:.0f} ms: import {import_ms:.0f} ms, "
+                f"first request {request_ms:.0f} ms (median of {options['runs']})"
+            )
+            self.stdout.write(f"  heavy modules loaded: {', '.join(last['heavy_modules']) or 'none'}")
+            self.report_imports(entry, options)
+
+        baseline, *others = options['entries']
+        for entry in others:
+            saved = totals[baseline] - totals[entry]
+            self.stdout.write(self.style.SUCCESS(
+                f"{entry}: {saved:.0f} ms ({saved / totals[baseline]:.0%}) faster cold start than {baseline}"
+            ))
+
+    def run_harness(self, entry, path, *interpreter_options):
+        # Each entry point picks its own settings module
+        env = {key: value for key, value in os.environ.items() if key != 'DJANGO_SETTINGS_MODULE'}
+        process = subprocess.run(
+            [sys.executable, *interpreter_options, '-m', 'core.startup', '--entry', entry, '--path', path],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if process.returncode != 0:
+            raise CommandError(f"{entry} failed to start:\n{process.stderr[-2000:]}")
+        return process
+
+    def cold_start(self, entry, path):
+        """(harness result, wall time of the whole process in ms)"""
+        started = time.perf_counter()
+        process = self.run_harness(entry, path)
+        total = (time.perf_counter() - started) * 1000
+        return json.loads(process.stdout.strip().splitlines()[-1]), total
+
+    def report_imports(self, entry, options):
+        # A separate run: -X importtime slows the interpreter down
+        rows = parse_importtime(self.run_harness(entry, options['path'], '-X', 'importtime').stderr)
+        packages = package_totals(rows).most_common(options['top'])
+        self.stdout.write("  slowest packages (self import time): " + ", ".join(
+            f"{name} {us / 1000:.1f} ms" for name, us in packages
+        ))
+        self.stdout.write("  slowest modules (self import time):")
+        for name, self_us, _, _ in sorted(rows, key=lambda row: -row[1])[:options['top']]:
+            self.stdout.write(f"    {self_us / 1000:8.1f} ms  {name}")
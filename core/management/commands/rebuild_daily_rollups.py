@@ -0,0 +1,31 @@
+from datetime import date, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from core.rollups import rebuild_all_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute daily stats rollups for a range of local days (backfill or repair)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='start', help="First day, YYYY-MM-DD (default: 30 days ago)")
+        parser.add_argument('--to', dest='end', help="Last day, YYYY-MM-DD (default: today)")
+
+    def handle(self, *args, **options):
+        try:
+            end = date.fromisoformat(options['end']) if options['end'] else timezone.localdate()
+            start = date.fromisoformat(options['start']) if options['start'] else end - timedelta(days=29)
+        except ValueError as e:
+            raise CommandError(f"Invalid date: {e}")
+        if start > end:
+            raise CommandError("--from must not be after --to")
+
+        # Work in month-sized chunks so each transaction's row locks stay short
+        changed = 0
+        chunk_start = start
+        while chunk_start <= end:
+            chunk_end = min(chunk_start + timedelta(days=30), end)
+            changed += rebuild_all_rollups(chunk_start, chunk_end)
+            chunk_start = chunk_end + timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt rollups for {start}..{end} ({changed} rows changed)"))
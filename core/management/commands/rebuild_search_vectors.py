@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.search import SEARCHABLE_MODELS, rebuild_search_vectors
+
+
+class Command(BaseCommand):
+    help = "Recompute catalog full-text search vectors (e.g. after bulk updates)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'types', nargs='*',
+            help=f"Catalogs to rebuild (default: all of {', '.join(SEARCHABLE_MODELS)})",
+        )
+
+    def handle(self, *args, **options):
+        types = options['types'] or list(SEARCHABLE_MODELS)
+        unknown = set(types) - set(SEARCHABLE_MODELS)
+        if unknown:
+            raise CommandError(f"Unknown catalogs: {', '.join(sorted(unknown))}")
+
+        for type_name, updated in rebuild_search_vectors(types).items():
+            self.stdout.write(f"{type_name}: {updated} row(s)")
+        self.stdout.write(self.style.SUCCESS("Search vectors rebuilt"))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.counters import COUNTED_MODELS, rebuild_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute registration counters from scratch and report any drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'entities', nargs='*',
+            help=f"Entities to rebuild (default: all of {', '.join(COUNTED_MODELS)})",
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help="Only report drift, do not repair it",
+        )
+
+    def handle(self, *args, **options):
+        entities = options['entities'] or list(COUNTED_MODELS)
+        unknown = set(entities) - set(COUNTED_MODELS)
+        if unknown:
+            raise CommandError(f"Unknown entities: {', '.join(sorted(unknown))}")
+
+        drifted = 0
+        for entity in entities:
+            drift = rebuild_counters(entity, dry_run=options['dry_run'])
+            for bucket, (stored, actual) in sorted(drift.items()):
+                drifted += 1
+                self.stdout.write(f"{entity} {bucket}: stored={stored} actual={actual}")
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS("Counters are in sync"))
+        elif options['dry_run']:
+            self.stdout.write(self.style.WARNING(f"{drifted} counter(s) drifted"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Repaired {drifted} counter(s)"))
@@ -0,0 +1,57 @@
+import json
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory
+from webinars.views import WebinarViewSet
+from internships.views import InternshipViewSet
+from memberships.views import MembershipViewSet
+from core.response_cache import bump_response_cache_version
+
+
+# catalog -> (viewset, list URL name)
+CATALOG_VIEWSETS = {
+    'webinars': (WebinarViewSet, 'webinar-list'),
+    'internships': (InternshipViewSet, 'internship-list'),
+    'memberships': (MembershipViewSet, 'membership-list'),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Drop cached catalog responses and render the first list pages into the cache. "
+        "Run after each deploy so responses rendered by the previous code are not served."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', help="Public host the API is served on (default: first ALLOWED_HOSTS entry)")
+        parser.add_argument('--insecure', action='store_true', help="Warm http:// URLs instead of https://")
+        parser.add_argument('--pages', type=int, default=3, help="Pages to warm per catalog (default: 3)")
+        parser.add_argument('--page-size', type=int, help="page_size to request (default: the paginator's)")
+        parser.add_argument('--catalogs', nargs='+', choices=sorted(CATALOG_VIEWSETS), help="Catalogs to warm (default: all)")
+
+    def handle(self, *args, **options):
+        host = options['host'] or next((host for host in settings.ALLOWED_HOSTS if '*' not in host), None)
+        if not host:
+            raise CommandError("Pass --host; ALLOWED_HOSTS has no concrete host")
+        if options['pages'] < 1:
+            raise CommandError("--pages must be positive")
+
+        factory = APIRequestFactory(HTTP_HOST=host)
+        for name in options['catalogs'] or CATALOG_VIEWSETS:
+            viewset, url_name = CATALOG_VIEWSETS[name]
+            bump_response_cache_version(viewset.queryset.model)
+            view = viewset.as_view({'get': 'list'})
+            warmed = 0
+            for page in range(1, options['pages'] + 1):
+                params = {'page': page}
+                if options['page_size']:
+                    params['page_size'] = options['page_size']
+                response = view(factory.get(reverse(url_name), params, secure=not options['insecure']))
+                response.render()
+                if response.status_code != 200:
+                    break
+                warmed += 1
+                if not json.loads(response.content).get('next'):
+                    break
+            self.stdout.write(f"{name}: warmed {warmed} page(s)")
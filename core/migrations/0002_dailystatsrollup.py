@@ -0,0 +1,30 @@
+# Generated by Django 4.2.27 on 2026-10-18 17:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStatsRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('entity', models.CharField(max_length=50)),
+                ('bucket', models.CharField(max_length=100)),
+                ('value', models.BigIntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-date', 'entity', 'bucket'],
+                'indexes': [models.Index(fields=['entity', 'date'], name='core_dailys_entity_e4e92b_idx')],
+                'unique_together': {('date', 'entity', 'bucket')},
+            },
+        ),
+    ]
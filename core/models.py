@@ -0,0 +1,43 @@
+from django.db import models
+
+
+class StatsCounter(models.Model):
+    """
+    Running count (and amount sum) for one dashboard bucket of an entity,
+    e.g. ('membership_registration', 'payment_status:completed')
+    """
+    entity = models.CharField(max_length=50)
+    bucket = models.CharField(max_length=100)
+    value = models.BigIntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['entity', 'bucket']
+        unique_together = ('entity', 'bucket')
+
+    def __str__(self):
+        return f"{self.entity} {self.bucket}: {self.value}"
+
+
+class DailyStatsRollup(models.Model):
+    """
+    Per-day count (and amount sum) for one bucket of an entity, where the
+    day is the row's creation date in TIME_ZONE
+    """
+    date = models.DateField()
+    entity = models.CharField(max_length=50)
+    bucket = models.CharField(max_length=100)
+    value = models.BigIntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-date', 'entity', 'bucket']
+        unique_together = ('date', 'entity', 'bucket')
+        indexes = [
+            models.Index(fields=['entity', 'date']),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.entity} {self.bucket}: {self.value}"
@@ -0,0 +1,160 @@
+"""
+Postgres-built JSON rows for compiled list serializers
+
+database_json_row() turns the field plan of a CompiledSerializer into one
+json_build_object() expression per row, nesting a json_build_object() for
+every nested serializer. Timestamps, decimals and file URLs are formatted
+in SQL the way the DRF fields format them, so each row has the same keys,
+order and values as the serializer output, and Django only joins the
+text rows into the response body. Fields that cannot be formatted in SQL
+make the whole serializer fall back to Python serialization.
+"""
+from django.db import models
+from django.db.models import Case, Func, Value, When
+from django.db.models.functions import Cast
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+
+# DRF fields whose output is the column value itself
+PLAIN_FIELDS = (
+    serializers.BooleanField, serializers.IntegerField, serializers.FloatField,
+    serializers.CharField, serializers.ChoiceField,
+)
+
+
+class NotExpressible(Exception):
+    pass
+
+
+class JSONBuildObject(Func):
+    function = 'JSON_BUILD_OBJECT'
+    output_field = models.JSONField()
+
+    def __init__(self, pairs):
+        expressions = []
+        for key, expression in pairs:
+            expressions.extend((Value(key), expression))
+        super().__init__(*expressions)
+
+
+class ISODateTime(Func):
+    """A timestamptz as DRF's DateTimeField renders it in the current time zone"""
+    output_field = models.TextField()
+
+    def as_sql(self, compiler, connection, **extra_context):
+        column, params = compiler.compile(self.source_expressions[0])
+        tz = timezone.get_current_timezone_name()
+        local = f'(({column}) AT TIME ZONE %s)'
+        local_params = (*params, tz)
+        sql = (
+            f"to_char({local}, 'YYYY-MM-DD\"T\"HH24:MI:SS') || "
+            f"CASE WHEN date_part('microseconds', {local})::int %% 1000000 = 0 THEN '' "
+            f"ELSE to_char({local}, '.US') END || "
+        )
+        sql_params = local_params * 3
+        if tz == 'UTC':
+            return sql + "'Z'", sql_params
+
+        offset = f"date_part('epoch', {local} - (({column}) AT TIME ZONE 'UTC'))::int"
+        offset_params = (*local_params, *params)
+        sql += (
+            f"CASE WHEN {offset} = 0 THEN 'Z' ELSE "
+            f"CASE WHEN {offset} < 0 THEN '-' ELSE '+' END || "
+            f"lpad((abs({offset}) / 3600)::text, 2, '0') || ':' || "
+            f"lpad((abs({offset}) %% 3600 / 60)::text, 2, '0') END"
+        )
+        return sql, sql_params + offset_params * 4
+
+
+class URIPath(Func):
+    """A file name percent-encoded like django.utils.encoding.filepath_to_uri"""
+    output_field = models.TextField()
+    safe = "[A-Za-z0-9_.~!*()'/-]"
+
+    def as_sql(self, compiler, connection, **extra_context):
+        name, params = compiler.compile(self.source_expressions[0])
+        safe = self.safe.replace("'", "''")
+        encoded = (
+            "(SELECT string_agg(CASE WHEN ch ~ '{safe}' THEN ch ELSE upper(regexp_replace("
+            "encode(convert_to(ch, 'UTF8'), 'hex'), '(..)', '%%\\1', 'g')) END, '' ORDER BY i) "
+            "FROM regexp_split_to_table(({name}), '') WITH ORDINALITY AS chars(ch, i))"
+        ).format(safe=safe, name=name)
+        sql = f"CASE WHEN ({name}) ~ '^{safe}*$' THEN ({name}) ELSE {encoded} END"
+        return sql, params * 3
+
+
+def _file_url_prefix(storage, request):
+    """URL prefix the storage puts in front of file names, if it is a plain prefix"""
+    prefix = storage.url('')
+    if storage.url('probe/file.png') != prefix + 'probe/file.png':
+        raise NotExpressible('file URLs are not a plain prefix')
+    if request is not None:
+        prefix = request.build_absolute_uri(prefix)
+    return prefix
+
+
+def _value_expression(field, model_field, lookup):
+    column = models.F(lookup)
+    if isinstance(field, serializers.DateTimeField):
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        if output_format is None or output_format.lower() != ISO_8601:
+            raise NotExpressible('custom datetime format')
+        return ISODateTime(column)
+    if isinstance(field, serializers.DateField):
+        output_format = getattr(field, 'format', api_settings.DATE_FORMAT)
+        if output_format is None or output_format.lower() != ISO_8601:
+            raise NotExpressible('custom date format')
+        return Func(column, Value('YYYY-MM-DD'), function='to_char', output_field=models.TextField())
+    if isinstance(field, serializers.DecimalField):
+        if not field.coerce_to_string or field.decimal_places != getattr(model_field, 'decimal_places', None):
+            raise NotExpressible('decimal rendering differs from the column')
+        return Cast(column, models.TextField())
+    if isinstance(field, serializers.UUIDField):
+        if field.uuid_format != 'hex_verbose':
+            raise NotExpressible('custom uuid format')
+        return Cast(column, models.TextField())
+    if isinstance(field, serializers.ListField) and not isinstance(field.child, PLAIN_FIELDS):
+        raise NotExpressible('list items need formatting')
+    if isinstance(field, PLAIN_FIELDS + (serializers.ListField, serializers.JSONField)):
+        return column
+    raise NotExpressible(f'{type(field).__name__} has no SQL equivalent')
+
+
+def _build(plan, fields, request):
+    pairs = []
+    for key, kind, lookup, extra in plan:
+        field = fields[key]
+        if kind == 'nested':
+            nested = JSONBuildObject(_build(extra, field.fields, request))
+            pairs.append((key, Case(When(**{f'{lookup}__isnull': True}, then=Value(None)), default=nested)))
+        elif kind == 'pk':
+            pairs.append((key, models.F(lookup)))
+        elif kind == 'file':
+            if not getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+                pairs.append((key, Func(models.F(lookup), Value(''), function='NULLIF')))
+                continue
+            prefix = _file_url_prefix(extra.storage, request)
+            pairs.append((key, Case(
+                When(**{f'{lookup}__isnull': True}, then=Value(None)),
+                When(**{lookup: ''}, then=Value(None)),
+                default=Func(Value(prefix), URIPath(models.F(lookup)), function='CONCAT'),
+                output_field=models.TextField(),
+            )))
+        else:
+            pairs.append((key, _value_expression(field, extra, lookup)))
+    return pairs
+
+
+def database_json_row(compiled, context):
+    """
+    Text expression building a row's JSON in Postgres, or None when some
+    field cannot be rendered identically in SQL
+    """
+    serializer = compiled.serializer_class(context=context)
+    try:
+        pairs = _build(compiled.plan, serializer.fields, context.get('request'))
+    except NotExpressible:
+        return None
+    return Cast(JSONBuildObject(pairs), models.TextField())
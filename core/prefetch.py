@@ -0,0 +1,110 @@
+"""
+Automatic eager loading for nested serializers
+
+eager_loading_lookups() walks a serializer's readable fields (nested
+serializers, dotted sources such as 'user.name', and related fields that
+need more than the primary key) and maps them onto the model's relations:
+forward foreign keys become select_related() paths, and reverse,
+many-to-many and generic relations become prefetch_related() paths.
+EagerLoadingMixin applies them to a viewset's queryset for the serializer
+of the current action, so list pages run in a constant number of queries.
+"""
+from functools import lru_cache
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+
+def _relation_steps(model, source):
+    """
+    Yield (path, related model, many) for every relation a dotted source
+    crosses, stopping at the first attribute that is not a model relation
+    """
+    path = []
+    for attr in source.split('.'):
+        if model is None:
+            return
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return
+        if not field.is_relation:
+            return
+        path.append(attr)
+        many = field.many_to_many or field.one_to_many or field.related_model is None
+        yield '__'.join(path), field.related_model, many
+        model = field.related_model
+
+
+def _needs_related_object(field):
+    """Related fields that render more than the foreign key column"""
+    if isinstance(field, serializers.ManyRelatedField):
+        return True
+    return isinstance(field, serializers.RelatedField) and not isinstance(
+        field, serializers.PrimaryKeyRelatedField
+    )
+
+
+def _collect(serializer, model, prefix, prefetched, select_related, prefetch_related):
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*':
+            continue
+
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        is_nested = isinstance(nested, serializers.BaseSerializer)
+        source = field.source
+        if not is_nested and not _needs_related_object(field):
+            # A plain field only touches relations through a dotted source
+            if '.' not in source:
+                continue
+            source = source.rsplit('.', 1)[0]
+
+        related_model = None
+        many = prefetched
+        lookup = None
+        for path, related_model, crosses_many in _relation_steps(model, source):
+            many = many or crosses_many
+            lookup = prefix + path
+            (prefetch_related if many else select_related).add(lookup)
+
+        if is_nested and lookup is not None and related_model is not None:
+            _collect(nested, related_model, lookup + '__', many, select_related, prefetch_related)
+
+
+@lru_cache(maxsize=512)
+def eager_loading_lookups(serializer_class):
+    """Return (select_related, prefetch_related) lookups for a ModelSerializer"""
+    model = getattr(getattr(serializer_class, 'Meta', None), 'model', None)
+    if model is None:
+        return (), ()
+    select_related, prefetch_related = set(), set()
+    _collect(serializer_class(), model, '', False, select_related, prefetch_related)
+
+    # A path already joined by a longer select_related path is redundant
+    select_related = {
+        path for path in select_related
+        if not any(other.startswith(path + '__') for other in select_related)
+    }
+    return tuple(sorted(select_related)), tuple(sorted(prefetch_related))
+
+
+def eager_load(queryset, serializer_class):
+    select_related, prefetch_related = eager_loading_lookups(serializer_class)
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetch_related:
+        queryset = queryset.prefetch_related(*prefetch_related)
+    return queryset
+
+
+class EagerLoadingMixin:
+    """Eager load the relations used by the serializer of the current action"""
+
+    def get_output_serializer_class(self):
+        """Serializer class that renders responses; SparseFieldsMixin narrows it"""
+        return self.get_serializer_class()
+
+    def eager_load(self, queryset):
+        return eager_load(queryset, self.get_output_serializer_class())
+
+    def filter_queryset(self, queryset):
+        return self.eager_load(super().filter_queryset(queryset))
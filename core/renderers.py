@@ -0,0 +1,42 @@
+"""
+JSON rendering with orjson
+
+ORJSONRenderer produces the same bytes as DRF's JSONRenderer for API
+responses: compact separators, UTF-8 output, 'Z' for UTC datetimes and
+U+2028/U+2029 escaped. Types orjson does not encode natively (Decimal,
+lazy strings, sets, querysets, ...) go through DRF's JSONEncoder.default,
+so they come out as before. Pretty-printed output (the browsable API,
+'; indent=' media types) and ASCII-only output use the stdlib renderer.
+"""
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+LINE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Drop-in JSONRenderer backed by orjson
+    NaN and infinity render as null instead of raising, and floats from
+    1e16 up are written as 1e16 rather than 1e+16 (the same value).
+    """
+    default = staticmethod(JSONEncoder().default)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.ensure_ascii or not self.compact or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # Integers beyond 64 bits and other values only the stdlib encodes
+            return super().render(data, accepted_media_type, renderer_context)
+        for raw, escaped in LINE_SEPARATORS:
+            if raw in ret:
+                ret = ret.replace(raw, escaped)
+        return ret
@@ -0,0 +1,215 @@
+"""
+Full-response caching for the public catalog endpoints
+
+Rendered JSON responses of list and retrieve are cached under a key built
+from the model's cache version, the action, scheme, host, path and the
+normalized query string. Saving or deleting a row of the model bumps its
+version after commit, so every cached page of that model is dropped at
+once and the old entries expire through their TTL. Responses also carry
+Cache-Control: public, s-maxage so the edge can serve repeat requests.
+
+Responses embed file URLs, which S3 query string auth signs with an
+expiry, so while it is on entries are kept for at most a quarter of the
+URLs' lifetime (response_cache_timeout()).
+
+Responses are rendered through core.stampede: when an entry expires one
+worker re-renders it while the others keep serving the stale copy, and
+identical concurrent requests in one process share a single render.
+"""
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import parse_http_date_safe, urlencode
+from rest_framework.response import Response
+from core.stampede import aget_or_compute, get_or_compute
+
+
+def _version_key(model):
+    return f'response-cache:version:{model._meta.label_lower}'
+
+
+def response_cache_version(model):
+    version = cache.get(_version_key(model))
+    if version is None:
+        # Seed from the clock so a lost version never reuses old keys
+        cache.add(_version_key(model), int(time.time()), timeout=None)
+        version = cache.get(_version_key(model))
+    return version
+
+
+async def aresponse_cache_version(model):
+    version = await cache.aget(_version_key(model))
+    if version is None:
+        await cache.aadd(_version_key(model), int(time.time()), timeout=None)
+        version = await cache.aget(_version_key(model))
+    return version
+
+
+def bump_response_cache_version(model):
+    """Drop every cached response of a model by moving to a new version"""
+    try:
+        cache.incr(_version_key(model))
+    except ValueError:
+        cache.add(_version_key(model), int(time.time()), timeout=None)
+
+
+def response_cache_timeout():
+    """CATALOG_CACHE_TIMEOUT, kept well below the lifetime of signed file URLs"""
+    if settings.USE_S3 and settings.AWS_QUERYSTRING_AUTH:
+        return min(settings.CATALOG_CACHE_TIMEOUT, settings.AWS_QUERYSTRING_EXPIRE // 4)
+    return settings.CATALOG_CACHE_TIMEOUT
+
+
+def normalized_query(query_params):
+    """Query string with sorted keys, empty values and ?page=1 dropped"""
+    params = []
+    for name in sorted(query_params):
+        values = [value for value in query_params.getlist(name) if value != '']
+        if name == 'page' and values == ['1']:
+            continue
+        params.extend((name, value) for value in values)
+    return urlencode(params)
+
+
+def response_cache_key(request, model, action):
+    url = f'{request.scheme}://{request.get_host()}{request.path}?{normalized_query(request.query_params)}'
+    digest = hashlib.md5(f'{request.accepted_media_type}|{url}'.encode()).hexdigest()
+    return f'response-cache:{model._meta.label_lower}:{response_cache_version(model)}:{action}:{digest}'
+
+
+def _parse_last_modified(response):
+    return parse_http_date_safe(response['Last-Modified']) if response.has_header('Last-Modified') else None
+
+
+def patch_public_cache_headers(response):
+    patch_cache_control(
+        response, public=True, max_age=0,
+        s_maxage=settings.CATALOG_CACHE_S_MAXAGE,
+        stale_while_revalidate=settings.CATALOG_CACHE_S_MAXAGE,
+    )
+    patch_vary_headers(response, ['Accept'])
+
+
+def render_response(view, request, response):
+    """Render a view's Response before finalize_response() would"""
+    response.accepted_renderer = request.accepted_renderer
+    response.accepted_media_type = request.accepted_media_type
+    response.renderer_context = view.get_renderer_context()
+    return response.render()
+
+
+class Uncacheable(Exception):
+    """A handler response that must not be stored, e.g. a 404 or a 304"""
+
+    def __init__(self, response):
+        super().__init__(response.status_code)
+        self.response = response
+
+
+class ResponseCacheMixin:
+    """
+    Cache rendered list and retrieve responses
+    Responses are flagged with an X-Cache: HIT/MISS header.
+    """
+    cached_actions = ('list', 'retrieve')
+
+    def is_response_cacheable(self, request):
+        if self.action not in self.cached_actions or getattr(request.accepted_renderer, 'format', None) != 'json':
+            return False
+        # Staff-only exact counts differ from what everyone else gets
+        use_exact_count = getattr(self.paginator, 'use_exact_count', None)
+        return not (use_exact_count and use_exact_count(request))
+
+    def cacheable_content(self, request, response):
+        """(content, content_type, validators) to store for a handler response"""
+        if response.status_code != 200:
+            raise Uncacheable(response)
+        if isinstance(response, Response):
+            self.render_response(request, response)
+        validators = {name: response[name] for name in ('ETag', 'Last-Modified') if response.has_header(name)}
+        return response.content, response['Content-Type'], validators
+
+    def stored_response(self, request, stored, cached):
+        content, content_type, validators = stored
+        response = HttpResponse(content, content_type=content_type, headers=validators)
+        response['X-Cache'] = 'HIT' if cached else 'MISS'
+        patch_public_cache_headers(response)
+        # Stored ETag/Last-Modified answer conditional requests without rendering
+        return get_conditional_response(request, response.get('ETag'), _parse_last_modified(response), response)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if not self.is_response_cacheable(request):
+            response = handler(request, *args, **kwargs)
+            patch_cache_control(response, private=True)
+            return response
+
+        key = response_cache_key(request, self.get_queryset().model, self.action)
+        handled = []
+
+        def render():
+            response = handler(request, *args, **kwargs)
+            handled.append(response)
+            return self.cacheable_content(request, response)
+
+        try:
+            stored, cached = get_or_compute(key, render, response_cache_timeout())
+        except Uncacheable as e:
+            # Requests that only waited for another thread's render run their own handler
+            response = e.response if handled else handler(request, *args, **kwargs)
+            response['X-Cache'] = 'MISS'
+            return response
+        return self.stored_response(request, stored, cached)
+
+    async def acached_response(self, handler, request, *args, **kwargs):
+        """cached_response() for an async handler"""
+        if not self.is_response_cacheable(request):
+            response = await handler(request, *args, **kwargs)
+            patch_cache_control(response, private=True)
+            return response
+
+        key = response_cache_key(request, self.get_queryset().model, self.action)
+        handled = []
+
+        async def render():
+            response = await handler(request, *args, **kwargs)
+            handled.append(response)
+            return self.cacheable_content(request, response)
+
+        try:
+            stored, cached = await aget_or_compute(key, render, response_cache_timeout())
+        except Uncacheable as e:
+            response = e.response if handled else await handler(request, *args, **kwargs)
+            response['X-Cache'] = 'MISS'
+            return response
+        return self.stored_response(request, stored, cached)
+
+    def render_response(self, request, response):
+        """Render a Response here, as finalize_response() would, so its bytes can be stored"""
+        return render_response(self, request, response)
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.acached_response(super().alist, request, *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.acached_response(super().aretrieve, request, *args, **kwargs)
+
+
+def invalidate_cached_responses(sender, **kwargs):
+    transaction.on_commit(lambda: bump_response_cache_version(sender))
+
+
+def connect_response_cache_signals(models):
+    for model in models:
+        post_save.connect(invalidate_cached_responses, sender=model, dispatch_uid=f'response-cache-save-{model._meta.label}')
+        post_delete.connect(invalidate_cached_responses, sender=model, dispatch_uid=f'response-cache-delete-{model._meta.label}')
@@ -0,0 +1,133 @@
+"""
+Daily statistics rollups
+
+DailyStatsRollup holds, for every local day, the buckets (see
+core.counters) of the rows created on that day. Saves and deletes keep
+the rows current incrementally; rebuild_rollups() recomputes a range of
+days from the source tables and is run periodically by Celery beat.
+Time-series stats read only from this table, so a chart's cost depends
+on the number of days, not on the number of registrations.
+"""
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate, Trunc
+from django.utils import timezone
+from core.counters import COUNTED_MODELS, TOTAL_BUCKET, bucket_name, lock_rollups
+from core.models import DailyStatsRollup
+
+
+GRANULARITIES = ('day', 'week', 'month')
+
+
+def local_day_bounds(start, end):
+    """Aware datetimes covering local days start..end inclusive"""
+    tz = timezone.get_current_timezone()
+    return (
+        timezone.make_aware(datetime.combine(start, time.min), tz),
+        timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min), tz),
+    )
+
+
+def compute_rollups(entity, start, end):
+    """Recount an entity's daily buckets: {(date, bucket): (value, amount)}"""
+    model, fields, amount_field, date_field = COUNTED_MODELS[entity]
+    lower, upper = local_day_bounds(start, end)
+    rows = model.objects.order_by().filter(
+        **{f'{date_field}__gte': lower, f'{date_field}__lt': upper}
+    ).annotate(day=TruncDate(date_field, tzinfo=timezone.get_current_timezone()))
+
+    annotations = {'value': Count('pk')}
+    if amount_field:
+        annotations['amount'] = Sum(amount_field)
+
+    computed = {}
+    for group in (None,) + fields:
+        columns = ('day', group) if group else ('day',)
+        for row in rows.values(*columns).annotate(**annotations):
+            bucket = bucket_name(group, row[group]) if group else TOTAL_BUCKET
+            computed[(row['day'], bucket)] = (row['value'], row.get('amount') or Decimal('0'))
+    return computed
+
+
+@transaction.atomic
+def rebuild_rollups(entity, start, end):
+    """
+    Recompute an entity's rollups for local days start..end inclusive
+    Returns the number of rows changed.
+
+    The entity's rollup lock is taken first: writers still in flight
+    commit before the recount, so it sees their rows, and later ones wait
+    and then apply on top of the recomputed values. Nothing can create a
+    row of the range between the recount and the insert.
+    """
+    lock_rollups(entity)
+    stored = {
+        (rollup.date, rollup.bucket): rollup
+        for rollup in DailyStatsRollup.objects.filter(
+            entity=entity, date__gte=start, date__lte=end
+        )
+    }
+    computed = compute_rollups(entity, start, end)
+
+    created, changed = [], []
+    for key in set(stored) | set(computed):
+        value, amount = computed.get(key, (0, Decimal('0')))
+        rollup = stored.get(key)
+        if rollup is None:
+            day, bucket = key
+            created.append(DailyStatsRollup(date=day, entity=entity, bucket=bucket, value=value, amount=amount))
+        elif rollup.value != value or rollup.amount != amount:
+            rollup.value = value
+            rollup.amount = amount
+            changed.append(rollup)
+
+    DailyStatsRollup.objects.bulk_create(created)
+    DailyStatsRollup.objects.bulk_update(changed, ['value', 'amount'])
+    return len(created) + len(changed)
+
+
+def rebuild_all_rollups(start, end):
+    """Recompute every entity's rollups for local days start..end inclusive"""
+    return sum(rebuild_rollups(entity, start, end) for entity in COUNTED_MODELS)
+
+
+def period_start(day, granularity):
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def iter_periods(start, end, granularity):
+    """Yield the start date of every period overlapping start..end"""
+    current = period_start(start, granularity)
+    while current <= end:
+        yield current
+        if granularity == 'day':
+            current += timedelta(days=1)
+        elif granularity == 'week':
+            current += timedelta(weeks=1)
+        else:
+            current = (current + timedelta(days=32)).replace(day=1)
+
+
+def read_rollups(start, end, granularity='day'):
+    """
+    Sum rollups per period for local days start..end inclusive
+    Returns {period start: {entity: {bucket: {'value', 'amount'}}}}
+    """
+    rows = DailyStatsRollup.objects.order_by().filter(date__gte=start, date__lte=end)
+    if granularity == 'day':
+        # TruncDate() would shift a DateField through TIME_ZONE; the column already is the day
+        rows = rows.values('entity', 'bucket', period=F('date'))
+    else:
+        rows = rows.values('entity', 'bucket', period=Trunc('date', granularity))
+
+    periods = {period: {} for period in iter_periods(start, end, granularity)}
+    for row in rows.annotate(value=Sum('value'), amount=Sum('amount')):
+        buckets = periods.setdefault(row['period'], {}).setdefault(row['entity'], {})
+        buckets[row['bucket']] = {'value': row['value'], 'amount': row['amount']}
+    return periods
@@ -0,0 +1,115 @@
+"""
+Full-text search over the webinar, internship and membership catalogs
+
+Each catalog model stores a weighted tsvector in `search_vector` (GIN
+indexed). It is recomputed in the database after every save, and
+rebuild_search_vectors() refreshes rows changed through queryset.update().
+Catalog filters and the unified /api/v1/search/ endpoint match against
+it with websearch syntax and order by ts_rank.
+"""
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import CharField, F, Func, TextField, Value
+from django.db.models.signals import post_save
+from webinars.models import Webinar
+from internships.models import Internship
+from memberships.models import Membership
+
+
+SEARCH_CONFIG = 'english'
+
+# type -> (model, title field, {searched field or expression: weight})
+SEARCHABLE_MODELS = {
+    'webinar': (Webinar, 'title', {'title': 'A', 'description': 'B'}),
+    'internship': (Internship, 'title', {'title': 'A', 'description': 'B'}),
+    'membership': (Membership, 'name', {
+        'name': 'A',
+        'description': 'B',
+        Func(F('benefits'), Value(' '), function='array_to_string', output_field=TextField()): 'C',
+    }),
+}
+
+TYPE_BY_MODEL = {model: type_name for type_name, (model, _, _) in SEARCHABLE_MODELS.items()}
+
+
+def search_vector(model):
+    """Weighted SearchVector expression for a catalog model"""
+    _, _, weights = SEARCHABLE_MODELS[TYPE_BY_MODEL[model]]
+    vectors = [
+        SearchVector(field, weight=weight, config=SEARCH_CONFIG)
+        for field, weight in weights.items()
+    ]
+    vector = vectors[0]
+    for other in vectors[1:]:
+        vector = vector + other
+    return vector
+
+
+def search_query(value):
+    return SearchQuery(value, search_type='websearch', config=SEARCH_CONFIG)
+
+
+def search_queryset(queryset, value):
+    """Filter a catalog queryset to rows matching `value`, best match first"""
+    query = search_query(value)
+    return queryset.filter(search_vector=query).annotate(
+        search_rank=SearchRank(F('search_vector'), query)
+    ).order_by('-search_rank', '-id')
+
+
+def search_catalogs(value, limit=20, types=None):
+    """
+    Rank matches across all catalogs in one UNION ALL query
+    Returns [{'type', 'id', 'title', 'description', 'is_active', 'rank'}]
+    """
+    query = search_query(value)
+    branches = []
+    for type_name, (model, title_field, _) in SEARCHABLE_MODELS.items():
+        if types and type_name not in types:
+            continue
+        # Each branch is limited on its own; the GIN index finds its matches
+        branches.append(
+            model.objects.filter(search_vector=query).annotate(
+                type=Value(type_name, output_field=CharField()),
+                title_text=F(title_field),
+                rank=SearchRank(F('search_vector'), query),
+            ).order_by('-rank', '-id').values(
+                'id', 'type', 'title_text', 'description', 'is_active', 'rank'
+            )[:limit]
+        )
+    if not branches:
+        return []
+
+    first, *rest = branches
+    rows = first.union(*rest, all=True).order_by('-rank', 'type', '-id')[:limit] if rest else first
+    return [
+        {
+            'type': row['type'],
+            'id': row['id'],
+            'title': row['title_text'],
+            'description': row['description'],
+            'is_active': row['is_active'],
+            'rank': row['rank'],
+        }
+        for row in rows
+    ]
+
+
+def update_search_vector(sender, instance, raw=False, **kwargs):
+    """Recompute a saved row's search vector in the database"""
+    if raw:
+        return
+    sender.objects.filter(pk=instance.pk).update(search_vector=search_vector(sender))
+
+
+def rebuild_search_vectors(types=None):
+    """Recompute the search vectors of every row; returns {type: rows updated}"""
+    return {
+        type_name: model.objects.update(search_vector=search_vector(model))
+        for type_name, (model, _, _) in SEARCHABLE_MODELS.items()
+        if not types or type_name in types
+    }
+
+
+def connect_search_signals():
+    for model in TYPE_BY_MODEL:
+        post_save.connect(update_search_vector, sender=model, dispatch_uid=f'search-save-{model._meta.label}')
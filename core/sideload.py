@@ -0,0 +1,112 @@
+"""
+Side-loaded related objects for list responses: ?include=
+
+?include=webinar,user replaces each named nested object in the rows with
+its primary key and renders every distinct related object once, in a
+top-level `included` map keyed by name and then by primary key:
+
+    {"results": [{"id": 7, "webinar": 2, "user": 31, ...}],
+     "included": {"webinar": {"2": {...}}, "user": {"31": {...}}}}
+
+Nested serializers on forward foreign keys can be included. Included
+objects use the nested serializer as narrowed by ?fields=/?exclude=.
+"""
+from functools import lru_cache
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from core.compiled_serializers import compile_serializer
+from core.prefetch import eager_load
+
+
+def includable_fields(serializer_class):
+    """{name: nested serializer field} for nested objects that can be side-loaded"""
+    model = serializer_class.Meta.model
+    includable = {}
+    for name, field in serializer_class().fields.items():
+        if field.write_only or not isinstance(field, serializers.ModelSerializer) or '.' in field.source:
+            continue
+        relation = model._meta.get_field(field.source)
+        if relation.concrete and (relation.many_to_one or relation.one_to_one):
+            includable[name] = field
+    return includable
+
+
+@lru_cache(maxsize=256)
+def sideloaded_serializer(serializer_class, names):
+    """Subclass of serializer_class rendering the `names` nested objects as primary keys"""
+    def get_fields(self):
+        fields = super(sideloaded, self).get_fields()
+        for name in names:
+            fields[name] = serializers.PrimaryKeyRelatedField(read_only=True, source=fields[name].source)
+        return fields
+
+    sideloaded = type(serializer_class.__name__, (serializer_class,), {
+        '__module__': serializer_class.__module__,
+        '__doc__': serializer_class.__doc__,
+        'get_fields': get_fields,
+    })
+    return sideloaded
+
+
+def serialize_related(field, pks, context):
+    """{pk: data} for the related objects of a nested serializer field"""
+    serializer_class = type(field)
+    queryset = serializer_class.Meta.model._default_manager.filter(pk__in=pks).order_by('pk')
+    compiled = compile_serializer(serializer_class)
+    if compiled is not None:
+        return compiled.serialize_by_pk(queryset, context)
+    objects = list(eager_load(queryset, serializer_class))
+    data = serializer_class(objects, many=True, context=context).data
+    return {obj.pk: item for obj, item in zip(objects, data)}
+
+
+class SideloadMixin:
+    """
+    Honour ?include= on the list action
+    Goes before SparseFieldsMixin so included objects follow ?fields=.
+    """
+    include_param = 'include'
+
+    def get_included_names(self):
+        """Validated ?include= names, in request order; () when absent"""
+        if self.action != 'list' or not self.request.query_params.get(self.include_param):
+            return ()
+        names = tuple(dict.fromkeys(
+            name.strip() for name in self.request.query_params[self.include_param].split(',') if name.strip()
+        ))
+        includable = includable_fields(super().get_output_serializer_class())
+        unknown = [name for name in names if name not in includable]
+        if unknown:
+            raise ValidationError({
+                'error': f"Cannot include {', '.join(unknown)}. Includable fields: {', '.join(includable) or 'none'}."
+            })
+        return names
+
+    def get_output_serializer_class(self):
+        serializer_class = super().get_output_serializer_class()
+        names = self.get_included_names()
+        return sideloaded_serializer(serializer_class, names) if names else serializer_class
+
+    def use_database_json(self, request):
+        # Database-built rows have nowhere to carry the included map
+        return not self.get_included_names() and super().use_database_json(request)
+
+    def get_included(self, rows, names):
+        nested = includable_fields(super().get_output_serializer_class())
+        context = self.get_serializer_context()
+        included = {}
+        for name in names:
+            pks = list(dict.fromkeys(row[name] for row in rows if row[name] is not None))
+            included[name] = serialize_related(nested[name], pks, context) if pks else {}
+        return included
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        names = self.get_included_names()
+        if not names:
+            return response
+        if isinstance(response.data, dict):
+            response.data['included'] = self.get_included(response.data['results'], names)
+        else:
+            response.data = {'results': response.data, 'included': self.get_included(response.data, names)}
+        return response
@@ -0,0 +1,40 @@
+"""
+Signal handlers keeping cached dashboard statistics, counters, search vectors
+and cached catalog responses fresh
+"""
+from django.db.models.signals import post_save, post_delete
+from users.models import User
+from webinars.models import Webinar, WebinarRegistration
+from internships.models import Internship, InternshipRegistration
+from memberships.models import Membership, MembershipRegistration
+from feedback.models import Feedback
+from core.cache import schedule_stats_invalidation
+from core.counters import connect_counter_signals
+from core.search import connect_search_signals
+from core.response_cache import connect_response_cache_signals
+
+
+STATS_SOURCE_MODELS = [
+    User,
+    Webinar,
+    WebinarRegistration,
+    Internship,
+    InternshipRegistration,
+    Membership,
+    MembershipRegistration,
+    Feedback,
+]
+
+
+def invalidate_stats(sender, **kwargs):
+    schedule_stats_invalidation()
+
+
+for model in STATS_SOURCE_MODELS:
+    post_save.connect(invalidate_stats, sender=model, dispatch_uid=f'stats-save-{model._meta.label}')
+    post_delete.connect(invalidate_stats, sender=model, dispatch_uid=f'stats-delete-{model._meta.label}')
+
+connect_counter_signals()
+connect_search_signals()
+# Cached catalog responses and list ETags (core.conditional) follow these versions
+connect_response_cache_signals(STATS_SOURCE_MODELS)
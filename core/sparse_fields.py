@@ -0,0 +1,234 @@
+"""
+Sparse fieldsets for read requests: ?fields= and ?exclude=
+
+Both take comma-separated field names, with dotted paths reaching into
+nested serializers (?fields=id,status,webinar.title). sparse_serializer()
+derives a serializer class that only renders the selected fields, nested
+serializers included, so eager loading, compiled list plans and Postgres
+JSON rows all follow the narrowed field set. The queryset is narrowed to
+the columns that class reads with .only() (or .defer() of the dropped
+columns when some field cannot be mapped onto a column).
+"""
+from functools import lru_cache
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from users.pagination import keyset_ordering
+
+
+class InvalidFieldPath(ValueError):
+    pass
+
+
+class NotDeferrable(Exception):
+    pass
+
+
+def parse_field_paths(value):
+    """
+    'id,webinar.title' -> (('id', None), ('webinar', (('title', None),)))
+    None marks a whole field; a selected field overrides its dotted children.
+    An empty value selects nothing in particular and returns None.
+    """
+    tree = {}
+    for path in value.split(','):
+        parts = [part.strip() for part in path.split('.')]
+        if not any(parts):
+            continue
+        if not all(parts):
+            raise InvalidFieldPath(f"'{path.strip()}' is not a valid field path")
+        node = tree
+        for part in parts[:-1]:
+            child = node.setdefault(part, {})
+            if child is None:
+                break
+            node = child
+        else:
+            node[parts[-1]] = None
+
+    def freeze(node):
+        return tuple(sorted((name, None if child is None else freeze(child)) for name, child in node.items()))
+    return freeze(tree) or None
+
+
+def _rebuild_nested(field, fields, exclude):
+    """A fresh copy of a nested serializer field that renders the selection"""
+    if isinstance(field, serializers.ListSerializer):
+        child = field.child
+        kwargs = dict(field._kwargs, child=sparse_serializer(type(child), fields, exclude)(*child._args, **child._kwargs))
+        return type(field)(*field._args, **kwargs)
+    return sparse_serializer(type(field), fields, exclude)(*field._args, **field._kwargs)
+
+
+def _select(serializer_name, fields, include, exclude):
+    readable = {name for name, field in fields.items() if not field.write_only}
+    for name, _ in (include or ()) + (exclude or ()):
+        if name not in readable:
+            raise InvalidFieldPath(f"'{name}' is not a field of {serializer_name}")
+
+    include = dict(include) if include is not None else None
+    exclude = dict(exclude or ())
+    selected = {}
+    for name, field in fields.items():
+        if field.write_only:
+            # Never rendered; kept so the serializer still validates input
+            selected[name] = field
+            continue
+        if include is not None and name not in include:
+            continue
+        if name in exclude and exclude[name] is None:
+            continue
+
+        nested_include = include.get(name) if include is not None else None
+        nested_exclude = exclude.get(name)
+        if nested_include is None and nested_exclude is None:
+            selected[name] = field
+            continue
+        target = field.child if isinstance(field, serializers.ListSerializer) else field
+        if not isinstance(target, serializers.BaseSerializer):
+            raise InvalidFieldPath(f"'{name}' has no nested fields")
+        selected[name] = _rebuild_nested(field, nested_include, nested_exclude)
+    return selected
+
+
+@lru_cache(maxsize=256)
+def sparse_serializer(serializer_class, fields=None, exclude=None):
+    """
+    Subclass of serializer_class rendering only `fields` minus `exclude`,
+    both as returned by parse_field_paths() (None means no restriction)
+    """
+    if fields is None and exclude is None:
+        return serializer_class
+
+    def get_fields(self):
+        return _select(serializer_class.__name__, super(sparse, self).get_fields(), fields, exclude)
+
+    sparse = type(serializer_class.__name__, (serializer_class,), {
+        '__module__': serializer_class.__module__,
+        '__doc__': serializer_class.__doc__,
+        'get_fields': get_fields,
+    })
+    # Unknown names fail here rather than halfway through a response
+    sparse().fields
+    return sparse
+
+
+def _source_fields(model, source):
+    """Model fields a dotted source walks through, ending at its column"""
+    walked = []
+    for attr in source.split('.'):
+        if model is None:
+            raise NotDeferrable(source)
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            raise NotDeferrable(source)
+        walked.append(field)
+        model = field.related_model
+    return walked
+
+
+def _column_lookups(serializer, model, prefix):
+    lookups = []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if field.source == '*' or isinstance(field, serializers.SerializerMethodField):
+            raise NotDeferrable(name)
+        walked = _source_fields(model, field.source)
+        if any(step.many_to_many or step.one_to_many or not step.concrete for step in walked):
+            # Reverse and many-to-many relations are loaded by their own query
+            continue
+        lookup = prefix + field.source.replace('.', '__')
+        for index in range(1, len(walked)):
+            lookups.append(prefix + '__'.join(step.name for step in walked[:index]))
+        lookups.append(lookup)
+        if isinstance(field, serializers.ModelSerializer):
+            try:
+                lookups.extend(_column_lookups(field, walked[-1].related_model, lookup + '__'))
+            except NotDeferrable:
+                # Without a related mask Django loads every column of the relation
+                pass
+    return lookups
+
+
+@lru_cache(maxsize=512)
+def column_lookups(serializer_class):
+    """only() lookups covering every column a serializer reads, or None"""
+    try:
+        lookups = _column_lookups(serializer_class(), serializer_class.Meta.model, '')
+    except NotDeferrable:
+        return None
+    return tuple(dict.fromkeys(lookups))
+
+
+def _plain_columns(serializer_class):
+    """Top-level concrete, non-relation columns a serializer renders by name"""
+    model = serializer_class.Meta.model
+    columns = set()
+    for field in serializer_class().fields.values():
+        if field.write_only or isinstance(field, serializers.BaseSerializer) or '.' in field.source:
+            continue
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            continue
+        if model_field.concrete and not model_field.is_relation and not model_field.primary_key:
+            columns.add(field.source)
+    return columns
+
+
+def load_selected_columns(queryset, serializer_class, sparse_class):
+    """Narrow a queryset to the columns sparse_class reads"""
+    lookups = column_lookups(sparse_class)
+    if lookups is not None:
+        # Cursor pagination reads the ordering fields from the page's rows
+        ordering = [field.lstrip('-') for field in keyset_ordering(sparse_class.Meta.model)]
+        return queryset.only(*lookups, *ordering)
+    deferred = _plain_columns(serializer_class) - _plain_columns(sparse_class)
+    return queryset.defer(*sorted(deferred)) if deferred else queryset
+
+
+class SparseFieldsMixin:
+    """
+    Honour ?fields= and ?exclude= on read requests
+    Responses render the selected fields only, and dropped columns are not loaded.
+    """
+    sparse_fields_param = 'fields'
+    sparse_exclude_param = 'exclude'
+
+    def get_field_selection(self):
+        """(fields, exclude) parsed from the query string; (None, None) when absent"""
+        if self.request.method not in SAFE_METHODS:
+            return None, None
+        params = self.request.query_params
+        try:
+            fields = parse_field_paths(params[self.sparse_fields_param]) if self.sparse_fields_param in params else None
+            exclude = parse_field_paths(params[self.sparse_exclude_param]) if self.sparse_exclude_param in params else None
+        except InvalidFieldPath as e:
+            raise ValidationError({'error': str(e)})
+        return fields, exclude
+
+    def get_output_serializer_class(self):
+        serializer_class = self.get_serializer_class()
+        fields, exclude = self.get_field_selection()
+        if fields is None and exclude is None:
+            return serializer_class
+        try:
+            return sparse_serializer(serializer_class, fields, exclude)
+        except InvalidFieldPath as e:
+            raise ValidationError({'error': str(e)})
+
+    def get_serializer(self, *args, **kwargs):
+        serializer_class = self.get_output_serializer_class()
+        kwargs.setdefault('context', self.get_serializer_context())
+        return serializer_class(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        serializer_class = self.get_serializer_class()
+        sparse_class = self.get_output_serializer_class()
+        if sparse_class is serializer_class or not issubclass(serializer_class, serializers.ModelSerializer):
+            return queryset
+        return load_selected_columns(queryset, serializer_class, sparse_class)
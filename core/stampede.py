@@ -0,0 +1,243 @@
+"""
+Stampede protection for expensive cached reads
+
+get_or_compute() stores values as CacheEntry(value, expires_at, delta),
+where delta is how long the value took to compute, and keeps them in the
+cache for CACHE_STALE_TTL seconds past their expiry:
+
+- Probabilistic early refresh: a reader refreshes a fresh entry early with
+  a probability that grows as expiry approaches and with delta, so hot
+  keys are usually recomputed before they expire at all.
+- Single flight: only the reader holding a short `<key>:lock` entry
+  (cache.add(), atomic in Redis) recomputes. Other readers get the stale
+  value, or wait for the new one when there is nothing to serve.
+- Coalescing: threads of one process that need the same key at the same
+  time share one recomputation.
+
+aget_or_compute() is the same for async views: cache calls are awaited
+and concurrent coroutines of one event loop share one recomputation.
+
+compute() reads from the primary database: everyone is served its result
+until it expires, so it must not come from a lagging replica.
+"""
+import asyncio
+import math
+import random
+import threading
+import time
+import uuid
+from collections import namedtuple
+from django.conf import settings
+from django.core.cache import cache
+from core.db_router import primary_reads
+
+
+CacheEntry = namedtuple('CacheEntry', ['value', 'expires_at', 'delta'])
+
+WAIT_INTERVAL = 0.05  # seconds between polls while another worker recomputes
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Run a function once per key for all threads that ask concurrently"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def run(self, key, function):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+coalesced = SingleFlight()
+
+
+class AsyncSingleFlight:
+    """Await a coroutine function once per key for all tasks of an event loop that ask concurrently"""
+
+    def __init__(self):
+        self._calls = {}
+
+    async def run(self, key, function):
+        key = (asyncio.get_running_loop(), key)
+        call = self._calls.get(key)
+        if call is not None:
+            return await asyncio.shield(call)
+
+        call = self._calls[key] = asyncio.ensure_future(function())
+        try:
+            return await asyncio.shield(call)
+        finally:
+            if call.done():
+                self._calls.pop(key, None)
+            else:
+                # This caller was cancelled; drop the entry once the others are served
+                call.add_done_callback(lambda _: self._calls.pop(key, None))
+
+
+acoalesced = AsyncSingleFlight()
+
+
+def read_entry(key):
+    entry = cache.get(key)
+    # Values stored by plain cache.set() count as missing
+    return entry if isinstance(entry, CacheEntry) else None
+
+
+def needs_refresh(entry, beta=1.0):
+    """XFetch: expired, or chosen for an early refresh"""
+    return time.time() - entry.delta * beta * math.log(1.0 - random.random()) >= entry.expires_at
+
+
+def store_entry(key, value, timeout, delta):
+    entry = CacheEntry(value, time.time() + timeout, delta)
+    cache.set(key, entry, timeout + settings.CACHE_STALE_TTL)
+    return entry
+
+
+def acquire_refresh_lock(key):
+    """A token if this caller may recompute `key`, else None"""
+    token = uuid.uuid4().hex
+    if cache.add(f'{key}:lock', token, settings.CACHE_REFRESH_LOCK_TIMEOUT):
+        return token
+    return None
+
+
+def release_refresh_lock(key, token):
+    if cache.get(f'{key}:lock') == token:
+        cache.delete(f'{key}:lock')
+
+
+def wait_for_entry(key):
+    """Poll for the entry another worker is computing; None if it gives up"""
+    deadline = time.monotonic() + settings.CACHE_REFRESH_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        entry = read_entry(key)
+        if entry is not None:
+            return entry
+        if cache.get(f'{key}:lock') is None:
+            return None
+    return None
+
+
+async def aread_entry(key):
+    entry = await cache.aget(key)
+    return entry if isinstance(entry, CacheEntry) else None
+
+
+async def astore_entry(key, value, timeout, delta):
+    entry = CacheEntry(value, time.time() + timeout, delta)
+    await cache.aset(key, entry, timeout + settings.CACHE_STALE_TTL)
+    return entry
+
+
+async def aacquire_refresh_lock(key):
+    token = uuid.uuid4().hex
+    if await cache.aadd(f'{key}:lock', token, settings.CACHE_REFRESH_LOCK_TIMEOUT):
+        return token
+    return None
+
+
+async def arelease_refresh_lock(key, token):
+    if await cache.aget(f'{key}:lock') == token:
+        await cache.adelete(f'{key}:lock')
+
+
+async def await_for_entry(key):
+    deadline = time.monotonic() + settings.CACHE_REFRESH_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(WAIT_INTERVAL)
+        entry = await aread_entry(key)
+        if entry is not None:
+            return entry
+        if await cache.aget(f'{key}:lock') is None:
+            return None
+    return None
+
+
+def get_or_compute(key, compute, timeout, beta=1.0):
+    """
+    Return (value, cached) for `key`, calling compute() at most once per
+    key across workers when the entry is missing, stale or refreshed early
+    """
+    entry = read_entry(key)
+    if entry is not None and not needs_refresh(entry, beta):
+        return entry.value, True
+    return coalesced.run(key, lambda: _refresh(key, compute, timeout, entry))
+
+
+def _refresh(key, compute, timeout, entry):
+    token = acquire_refresh_lock(key)
+    if token is None:
+        if entry is not None:
+            # Stale while another worker revalidates
+            return entry.value, True
+        entry = wait_for_entry(key)
+        if entry is not None:
+            return entry.value, True
+
+    try:
+        started = time.monotonic()
+        with primary_reads():
+            value = compute()
+        store_entry(key, value, timeout, time.monotonic() - started)
+        return value, False
+    finally:
+        if token is not None:
+            release_refresh_lock(key, token)
+
+
+async def aget_or_compute(key, acompute, timeout, beta=1.0):
+    """get_or_compute() for async callers; `acompute` is a coroutine function"""
+    entry = await aread_entry(key)
+    if entry is not None and not needs_refresh(entry, beta):
+        return entry.value, True
+    return await acoalesced.run(key, lambda: _arefresh(key, acompute, timeout, entry))
+
+
+async def _arefresh(key, acompute, timeout, entry):
+    token = await aacquire_refresh_lock(key)
+    if token is None:
+        if entry is not None:
+            return entry.value, True
+        entry = await await_for_entry(key)
+        if entry is not None:
+            return entry.value, True
+
+    try:
+        started = time.monotonic()
+        with primary_reads():
+            value = await acompute()
+        await astore_entry(key, value, timeout, time.monotonic() - started)
+        return value, False
+    finally:
+        if token is not None:
+            await arelease_refresh_lock(key, token)
@@ -0,0 +1,101 @@
+"""
+Cold-start measurement for the WSGI entry points
+
+`python -m core.startup --entry liture.wsgi` imports an entry point in a
+fresh interpreter, serves one request through it and prints a JSON line
+with the import time, the first request's time and which heavy optional
+modules got loaded. `manage.py profile_startup` runs it for each entry
+point, once more under `python -X importtime` to attribute the import
+time to packages and modules.
+"""
+import argparse
+import importlib
+import json
+import sys
+import time
+from collections import Counter
+from wsgiref.util import setup_testing_defaults
+
+
+DEFAULT_PATH = '/api/v1/webinars/list/'
+
+# Optional dependencies worth keeping out of a cold start
+HEAVY_MODULES = ('PIL', 'boto3', 'celery', 'kombu', 'redis', 'anymail', 'requests', 'django_extensions')
+
+
+def warm_url_resolver():
+    """Import the URLconf, compile every pattern and build the reverse tables now instead of on first use"""
+    from django.urls import get_resolver
+
+    resolver = get_resolver()
+    # Populating compiles the patterns of the URLconf and of included ones
+    resolver.reverse_dict
+    # Namespaced includes (admin) fill their own tables when first reversed
+    for _, namespaced in resolver.namespace_dict.values():
+        namespaced.reverse_dict
+
+
+def first_request(application, path):
+    """Serve a GET for `path` through a WSGI application and return the status line"""
+    from django.conf import settings
+
+    host = next((host for host in settings.ALLOWED_HOSTS if host and '*' not in host and not host.startswith('.')), 'localhost')
+    environ = {'PATH_INFO': path, 'HTTP_HOST': host}
+    setup_testing_defaults(environ)
+    statuses = []
+    response = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    try:
+        for _ in response:
+            pass
+    finally:
+        if hasattr(response, 'close'):
+            response.close()
+    return statuses[0]
+
+
+def parse_importtime(output):
+    """(module, self µs, cumulative µs, nesting depth) rows of `python -X importtime` output"""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        if self_us.strip().isdigit():
+            # One space after the separator, then two per nesting level
+            name = name[1:].rstrip()
+            depth = (len(name) - len(name.lstrip())) // 2
+            rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def package_totals(rows):
+    """Self import time per top-level package, in µs"""
+    totals = Counter()
+    for name, self_us, _, _ in rows:
+        totals[name.split('.')[0]] += self_us
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import a WSGI entry point and serve one request, timing both")
+    parser.add_argument('--entry', default='liture.wsgi', help="Module exposing `application`")
+    parser.add_argument('--path', default=DEFAULT_PATH, help="Path of the first request")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    application = importlib.import_module(args.entry).application
+    imported = time.perf_counter()
+    status = first_request(application, args.path)
+    served = time.perf_counter()
+
+    print(json.dumps({
+        'entry': args.entry,
+        'status': status,
+        'import_ms': (imported - started) * 1000,
+        'request_ms': (served - imported) * 1000,
+        'heavy_modules': [name for name in HEAVY_MODULES if name in sys.modules],
+    }))
+
+
+if __name__ == '__main__':
+    main()
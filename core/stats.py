@@ -1,14 +1,84 @@
 """
 Dashboard statistics aggregation
+
+The dashboard builders are written as dicts of independent query
+callables, run in turn for sync views and concurrently for async ones.
 """
-from django.db.models import Count, Q, Sum, Avg
+import asyncio
+from django.db.models import CharField, Count, F, Q, Value
 from django.utils import timezone
-from datetime import timedelta, datetime
+from datetime import timedelta
 from users.models import User
 from webinars.models import Webinar, WebinarRegistration
 from internships.models import Internship, InternshipRegistration
 from memberships.models import Membership, MembershipRegistration
 from feedback.models import Feedback
+from core.counters import TOTAL_BUCKET, read_counters, counter_value, counter_amount
+from core.rollups import read_rollups
+from core.async_views import database_sync_to_async
+
+
+STATUS_BUCKETS = ('pending', 'accepted', 'rejected')
+PAYMENT_BUCKETS = ('pending', 'completed', 'failed', 'refunded')
+
+# Registration type shown in stats payloads -> counted entity
+REGISTRATION_ENTITIES = {
+    'webinar': 'webinar_registration',
+    'internship': 'internship_registration',
+    'membership': 'membership_registration',
+}
+
+
+def aggregate_buckets(queryset, **buckets):
+    """
+    Count several buckets of a table in a single query
+
+    Each keyword maps a bucket name to a Q filter (or None for the
+    whole table) and is compiled into a COUNT(...) FILTER (WHERE ...)
+    column, so one round-trip returns every bucket at once.
+    Aggregate expressions (e.g. Sum) are passed through unchanged.
+    """
+    aggregates = {}
+    for name, condition in buckets.items():
+        if condition is None:
+            aggregates[name] = Count('pk')
+        elif isinstance(condition, Q):
+            aggregates[name] = Count('pk', filter=condition)
+        else:
+            aggregates[name] = condition
+    return queryset.aggregate(**aggregates)
+
+
+def run_queries(queries):
+    """{name: result} of a dict of query callables, run one after another"""
+    return {name: query() for name, query in queries.items()}
+
+
+async def arun_queries(queries):
+    """
+    run_queries() for async callers, with the queries run concurrently
+
+    Each query runs in a pool thread on that thread's own database
+    connection; Django's async ORM would instead queue them all on the
+    single thread it reserves for the request.
+    """
+    results = await asyncio.gather(*(database_sync_to_async(query)() for query in queries.values()))
+    return dict(zip(queries, results))
+
+
+def _active_count(model):
+    return aggregate_buckets(model.objects.all(), active=Q(is_active=True))['active']
+
+
+def _dashboard_simple_queries():
+    return {
+        'normal_users': lambda: aggregate_buckets(
+            User.objects.all(), normal=Q(is_staff=False, is_superuser=False)
+        )['normal'],
+        'internships': lambda: _active_count(Internship),
+        'webinars': lambda: _active_count(Webinar),
+        'memberships': lambda: _active_count(Membership),
+    }
 
 
 def get_dashboard_stats_simple():
@@ -16,220 +86,240 @@ def get_dashboard_stats_simple():
     Get basic dashboard statistics
     Returns counts of active internships, webinars, and memberships
     """
-    normal_users = User.objects.filter(is_staff=False, is_superuser=False).count()
-    internships = Internship.objects.filter(is_active=True).count()
-    webinars = Webinar.objects.filter(is_active=True).count()
-    memberships = Membership.objects.filter(is_active=True).count()
-    
-    return {
-        'normal_users': normal_users,
-        'internships': internships,
-        'webinars': webinars,
-        'memberships': memberships,
-    }
+    return run_queries(_dashboard_simple_queries())
+
+
+async def aget_dashboard_stats_simple():
+    """get_dashboard_stats_simple() with its counts queried concurrently"""
+    return await arun_queries(_dashboard_simple_queries())
+
+
+def _counted_statuses(counters, entity, field='status', values=STATUS_BUCKETS):
+    """Read {value: count} for one counted field from the counter table"""
+    return {value: counter_value(counters, entity, f'{field}:{value}') for value in values}
 
 
 def get_registration_status_stats():
-    """Get registration status counts for internship, webinar, and membership"""
+    """
+    Get registration status counts for internship, webinar, and membership
+    Served from the counter table in a single query
+    """
+    counters = read_counters()
+
+    def status_counts(entity):
+        counts = _counted_statuses(counters, entity)
+        return {
+            'approved': counts['accepted'],
+            'rejected': counts['rejected'],
+            'pending': counts['pending'],
+        }
+
     return {
-        'internship': {
-            'approved': InternshipRegistration.objects.filter(status='accepted').count(),
-            'rejected': InternshipRegistration.objects.filter(status='rejected').count(),
-            'pending': InternshipRegistration.objects.filter(status='pending').count(),
-        },
-        'webinar': {
-            'approved': WebinarRegistration.objects.filter(status='accepted').count(),
-            'rejected': WebinarRegistration.objects.filter(status='rejected').count(),
-            'pending': WebinarRegistration.objects.filter(status='pending').count(),
-        },
-        'membership': {
-            'approved': MembershipRegistration.objects.filter(status='accepted').count(),
-            'rejected': MembershipRegistration.objects.filter(status='rejected').count(),
-            'pending': MembershipRegistration.objects.filter(status='pending').count(),
-        },
+        'internship': status_counts('internship_registration'),
+        'webinar': status_counts('webinar_registration'),
+        'membership': status_counts('membership_registration'),
     }
 
 
-def get_past_registration_stats():
+def get_past_registration_stats(start=None, end=None, granularity='day'):
     """
-    Get registration statistics for the past 10 days
-    Groups by date and registration type (webinar, internship)
+    Get registration statistics per day, week or month
+    Defaults to the past 10 days; served only from the daily rollups, with
+    day boundaries in TIME_ZONE
+    Returns: list of periods with registration counts per type and status,
+    new users and completed-payment revenue
     """
-    today = timezone.now()
-    
-    # Calculate date range (past 10 days including today)
-    end_date = today.replace(hour=23, minute=59, second=59, microsecond=999999)
-    start_date = (today - timedelta(days=9)).replace(hour=0, minute=0, second=0, microsecond=0)
-    
-    # Get webinar registrations
-    webinar_registrations = WebinarRegistration.objects.filter(
-        created_at__gte=start_date,
-        created_at__lte=end_date
-    ).values('created_at__date').annotate(count=Count('id'))
-    
-    # Get internship registrations
-    internship_registrations = InternshipRegistration.objects.filter(
-        applied_at__gte=start_date,
-        applied_at__lte=end_date
-    ).values('applied_at__date').annotate(count=Count('id'))
-    
-    # Create a dict for easy lookup
-    webinar_dict = {item['created_at__date'].isoformat(): item['count'] for item in webinar_registrations}
-    internship_dict = {item['applied_at__date'].isoformat(): item['count'] for item in internship_registrations}
-    
-    # Build result for past 10 days
-    days = []
-    for i in range(9, -1, -1):
-        date = (today - timedelta(days=i)).date()
-        date_str = date.isoformat()
-        
-        days.append({
-            'date': date_str,
-            'webinar': webinar_dict.get(date_str, 0),
-            'internship': internship_dict.get(date_str, 0),
+    end = end or timezone.localdate()
+    start = start or end - timedelta(days=9)
+
+    stats = []
+    for period, rollups in sorted(read_rollups(start, end, granularity).items()):
+        stats.append({
+            'date': period.isoformat(),
+            **{
+                name: counter_value(rollups, entity, TOTAL_BUCKET)
+                for name, entity in REGISTRATION_ENTITIES.items()
+            },
+            'new_users': counter_value(rollups, 'user', TOTAL_BUCKET),
+            'revenue': float(counter_amount(rollups, 'membership_registration', 'payment_status:completed')),
+            'status': {
+                name: _counted_statuses(rollups, entity)
+                for name, entity in REGISTRATION_ENTITIES.items()
+            },
         })
-    
-    return days
+    return stats
 
 
-def get_recent_registrations(limit=5):
+# (type, model, activity timestamp field, title field) for the activity feed
+RECENT_REGISTRATION_SOURCES = (
+    ('webinar', WebinarRegistration, 'created_at', 'webinar__title'),
+    ('internship', InternshipRegistration, 'applied_at', 'internship__title'),
+    ('membership', MembershipRegistration, 'created_at', 'membership__name'),
+)
+
+RECENT_REGISTRATION_TYPES = tuple(source[0] for source in RECENT_REGISTRATION_SOURCES)
+
+
+def get_recent_registrations(limit=5, before=None):
     """
-    Get recent registrations across webinars and internships
-    Returns the most recent registrations with relevant details
+    Get recent registrations across webinars, internships and memberships
+    Runs one ordered UNION ALL query that projects only the payload columns.
+    `before` is an optional (timestamp, type, id) keyset cursor taken from
+    the last row of the previous page. Rows are ordered by the same triple,
+    since ids are only comparable within one type.
     """
-    recent = []
-    
-    # Get recent webinar registrations
-    webinar_regs = WebinarRegistration.objects.select_related(
-        'webinar', 'user'
-    ).order_by('-created_at')[:limit]
-    
-    for reg in webinar_regs:
-        recent.append({
-            'id': str(reg.id),
-            'full_name': reg.user.name,
-            'email': reg.user.email,
-            'phone_number': reg.user.phone_number,
-            'reason': reg.reason,
-            'type': 'webinar',
-            'title': reg.webinar.title,
-            'created_at': reg.created_at.isoformat(),
-        })
-    
-    # Get recent internship registrations
-    internship_regs = InternshipRegistration.objects.select_related(
-        'internship', 'user'
-    ).order_by('-applied_at')[:limit]
-    
-    for reg in internship_regs:
-        recent.append({
-            'id': str(reg.id),
-            'full_name': reg.user.name,
-            'email': reg.user.email,
-            'phone_number': reg.user.phone_number,
-            'reason': reg.reason,
-            'type': 'internship',
-            'title': reg.internship.title,
-            'created_at': reg.applied_at.isoformat(),
-        })
-    
-    # Sort by created_at descending and return top limit
-    recent.sort(key=lambda x: x['created_at'], reverse=True)
-    return recent[:limit]
+    branches = []
+    for type_name, model, date_field, title_field in RECENT_REGISTRATION_SOURCES:
+        rows = model.objects.all()
+        if before is not None:
+            timestamp, cursor_type, pk = before
+            # Rows tied on the timestamp: types sorting below the cursor's all follow it
+            if type_name < cursor_type:
+                tied = Q(**{date_field: timestamp})
+            elif type_name == cursor_type:
+                tied = Q(**{date_field: timestamp, 'id__lt': pk})
+            else:
+                tied = Q(pk__in=[])
+            rows = rows.filter(Q(**{f'{date_field}__lt': timestamp}) | tied)
+        # Each branch is limited on its own so it can walk its timestamp index
+        branches.append(
+            rows.order_by(f'-{date_field}', '-id').annotate(
+                full_name=F('user__name'),
+                email=F('user__email'),
+                phone_number=F('user__phone_number'),
+                type=Value(type_name, output_field=CharField()),
+                title=F(title_field),
+                timestamp=F(date_field),
+            ).values(
+                'id', 'full_name', 'email', 'phone_number', 'reason', 'type', 'title', 'timestamp'
+            )[:limit]
+        )
+
+    first, *rest = branches
+    rows = first.union(*rest, all=True).order_by('-timestamp', '-type', '-id')[:limit]
+
+    return [
+        {
+            'id': str(row['id']),
+            'full_name': row['full_name'],
+            'email': row['email'],
+            'phone_number': row['phone_number'],
+            'reason': row['reason'],
+            'type': row['type'],
+            'title': row['title'],
+            'created_at': row['timestamp'].isoformat(),
+        }
+        for row in rows
+    ]
+
+
+def _dashboard_queries():
+    """Independent queries of get_dashboard_stats(), by name"""
+    # Recent Activity (Last 7 days)
+    seven_days_ago = timezone.now() - timedelta(days=7)
+
+    return {
+        'counters': read_counters,
+        'users': lambda: aggregate_buckets(
+            User.objects.all(),
+            total=None,
+            active=Q(is_active=True),
+            staff=Q(is_staff=True),
+            normal=Q(is_staff=False, is_superuser=False),
+            recent=Q(created_at__gte=seven_days_ago),
+        ),
+        'webinars': lambda: aggregate_buckets(
+            Webinar.objects.all(), total=None, active=Q(is_active=True)
+        ),
+        'webinar_registrations': lambda: aggregate_buckets(
+            WebinarRegistration.objects.all(),
+            recent=Q(created_at__gte=seven_days_ago),
+        ),
+        'internships': lambda: aggregate_buckets(
+            Internship.objects.all(), total=None, active=Q(is_active=True)
+        ),
+        'internship_applications': lambda: aggregate_buckets(
+            InternshipRegistration.objects.all(),
+            recent=Q(applied_at__gte=seven_days_ago),
+        ),
+        'memberships': lambda: aggregate_buckets(
+            Membership.objects.all(), total=None, active=Q(is_active=True)
+        ),
+        'membership_registrations': lambda: aggregate_buckets(
+            MembershipRegistration.objects.all(),
+            recent=Q(created_at__gte=seven_days_ago),
+        ),
+        # Feedback Stats: rating/comment fields were removed from Feedback model
+        # Keep counts by type only
+        'feedback_by_type': lambda: dict(
+            Feedback.objects.values('feedback_type').annotate(count=Count('id'))
+            .values_list('feedback_type', 'count')
+        ),
+    }
 
 
 def get_dashboard_stats():
-    """Comprehensive dashboard statistics aggregation"""
-    
+    """
+    Comprehensive dashboard statistics aggregation
+    Issues one grouped query per table instead of one query per bucket;
+    registration totals, status/payment buckets and revenue come from
+    the counter table
+    """
+    return _dashboard_stats(run_queries(_dashboard_queries()))
+
+
+async def aget_dashboard_stats():
+    """get_dashboard_stats() with its queries run concurrently"""
+    return _dashboard_stats(await arun_queries(_dashboard_queries()))
+
+
+def _dashboard_stats(results):
+    counters = results['counters']
+
     # User Stats
-    total_users = User.objects.count()
-    active_users = User.objects.filter(is_active=True).count()
-    staff_users = User.objects.filter(is_staff=True).count()
-    normal_users = User.objects.filter(is_staff=False, is_superuser=False).count()
-    
+    user_counts = results['users']
+    total_users = user_counts['total']
+    active_users = user_counts['active']
+
     # Webinar Stats
-    total_webinars = Webinar.objects.count()
-    active_webinars = Webinar.objects.filter(is_active=True).count()
-    total_webinar_registrations = WebinarRegistration.objects.count()
-    
-    webinar_registration_status = {
-        'pending': WebinarRegistration.objects.filter(status='pending').count(),
-        'accepted': WebinarRegistration.objects.filter(status='accepted').count(),
-        'rejected': WebinarRegistration.objects.filter(status='rejected').count(),
-    }
-    
-    webinar_attendance = WebinarRegistration.objects.filter(attended=True).count()
-    
+    webinar_counts = results['webinars']
+    webinar_registration_counts = results['webinar_registrations']
+    total_webinar_registrations = counter_value(counters, 'webinar_registration', 'total')
+    webinar_registration_status = _counted_statuses(counters, 'webinar_registration')
+    webinar_attendance = counter_value(counters, 'webinar_registration', 'attended:True')
+
     # Internship Stats
-    total_internships = Internship.objects.count()
-    active_internships = Internship.objects.filter(is_active=True).count()
-    total_internship_applications = InternshipRegistration.objects.count()
-    
-    internship_application_status = {
-        'pending': InternshipRegistration.objects.filter(status='pending').count(),
-        'accepted': InternshipRegistration.objects.filter(status='accepted').count(),
-        'rejected': InternshipRegistration.objects.filter(status='rejected').count(),
-    }
-    
+    internship_counts = results['internships']
+    internship_application_counts = results['internship_applications']
+    total_internship_applications = counter_value(counters, 'internship_registration', 'total')
+    internship_application_status = _counted_statuses(counters, 'internship_registration')
+
     # Membership Stats
-    total_memberships = Membership.objects.count()
-    active_memberships = Membership.objects.filter(is_active=True).count()
-    total_membership_registrations = MembershipRegistration.objects.count()
-    
-    membership_registration_status = {
-        'pending': MembershipRegistration.objects.filter(status='pending').count(),
-        'accepted': MembershipRegistration.objects.filter(status='accepted').count(),
-        'rejected': MembershipRegistration.objects.filter(status='rejected').count(),
-    }
-    
-    membership_payment_status = {
-        'pending': MembershipRegistration.objects.filter(payment_status='pending').count(),
-        'completed': MembershipRegistration.objects.filter(payment_status='completed').count(),
-        'failed': MembershipRegistration.objects.filter(payment_status='failed').count(),
-        'refunded': MembershipRegistration.objects.filter(payment_status='refunded').count(),
-    }
-    
-    # Payment Revenue
-    total_revenue = MembershipRegistration.objects.filter(
-        payment_status='completed'
-    ).aggregate(total=Sum('payment_amount'))['total'] or 0
-    
-    # Feedback Stats: rating/comment fields were removed from Feedback model
-    # Keep counts by type only
-    feedback_by_type = dict(
-        Feedback.objects.values('feedback_type').annotate(count=Count('id'))
-        .values_list('feedback_type', 'count')
+    membership_counts = results['memberships']
+    membership_registration_counts = results['membership_registrations']
+    total_membership_registrations = counter_value(counters, 'membership_registration', 'total')
+    membership_registration_status = _counted_statuses(counters, 'membership_registration')
+    membership_payment_status = _counted_statuses(
+        counters, 'membership_registration', 'payment_status', PAYMENT_BUCKETS
     )
-    
-    # Recent Activity (Last 7 days)
-    seven_days_ago = timezone.now() - timedelta(days=7)
-    
-    recent_webinar_registrations = WebinarRegistration.objects.filter(
-        created_at__gte=seven_days_ago
-    ).count()
-    
-    recent_internship_applications = InternshipRegistration.objects.filter(
-        applied_at__gte=seven_days_ago
-    ).count()
-    
-    recent_membership_registrations = MembershipRegistration.objects.filter(
-        created_at__gte=seven_days_ago
-    ).count()
-    
-    recent_new_users = User.objects.filter(created_at__gte=seven_days_ago).count()
-    
+
+    # Payment Revenue
+    total_revenue = counter_amount(counters, 'membership_registration', 'payment_status:completed')
+
+    feedback_by_type = results['feedback_by_type']
+
     return {
         'users': {
             'total': total_users,
             'active': active_users,
-            'staff': staff_users,
-            'normal': normal_users,
+            'staff': user_counts['staff'],
+            'normal': user_counts['normal'],
             'inactive': total_users - active_users,
-            'recent_signups_7days': recent_new_users,
+            'recent_signups_7days': user_counts['recent'],
         },
         'webinars': {
-            'total': total_webinars,
-            'active': active_webinars,
+            'total': webinar_counts['total'],
+            'active': webinar_counts['active'],
             'total_registrations': total_webinar_registrations,
             'registration_status': webinar_registration_status,
             'attendance': webinar_attendance,
@@ -237,23 +327,23 @@ def get_dashboard_stats():
                 (webinar_attendance / total_webinar_registrations * 100) if total_webinar_registrations > 0 else 0,
                 2
             ),
-            'recent_registrations_7days': recent_webinar_registrations,
+            'recent_registrations_7days': webinar_registration_counts['recent'],
         },
         'internships': {
-            'total': total_internships,
-            'active': active_internships,
+            'total': internship_counts['total'],
+            'active': internship_counts['active'],
             'total_applications': total_internship_applications,
             'application_status': internship_application_status,
-            'recent_applications_7days': recent_internship_applications,
+            'recent_applications_7days': internship_application_counts['recent'],
         },
         'memberships': {
-            'total': total_memberships,
-            'active': active_memberships,
+            'total': membership_counts['total'],
+            'active': membership_counts['active'],
             'total_registrations': total_membership_registrations,
             'registration_status': membership_registration_status,
             'payment_status': membership_payment_status,
             'total_revenue': float(total_revenue),
-            'recent_registrations_7days': recent_membership_registrations,
+            'recent_registrations_7days': membership_registration_counts['recent'],
         },
         'feedback': {
             'by_type': feedback_by_type,
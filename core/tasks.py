@@ -0,0 +1,11 @@
+from celery import shared_task
+from datetime import timedelta
+from django.utils import timezone
+from core.rollups import rebuild_all_rollups
+
+
+@shared_task
+def rollup_daily_stats(days=2):
+    """Recompute the daily rollups of the last `days` local days, including today"""
+    today = timezone.localdate()
+    return rebuild_all_rollups(today - timedelta(days=days - 1), today)
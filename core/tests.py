@@ -0,0 +1,114 @@
+from itertools import count
+from unittest import mock
+from django.core.cache import cache
+from django.db.models.fields.files import FieldFile
+from datetime import date
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from users.models import User
+from webinars.models import Webinar, WebinarRegistration
+from webinars.serializers import WebinarSerializer
+from core.db_router import ReplicaRouter, _read_database
+from core.events import LocalBroker
+from core.response_cache import response_cache_timeout
+from core.views import stats_event_stream
+
+
+@override_settings(STATS_STREAM_KEEPALIVE=0.05, STATS_STREAM_MAX_AGE=5)
+class StatsEventStreamTests(SimpleTestCase):
+    async def test_stream_survives_keepalive(self):
+        broker = LocalBroker()
+        with mock.patch('core.views.get_broker', return_value=broker):
+            stream = stats_event_stream()
+            try:
+                self.assertEqual(await stream.__anext__(), 'retry: 5000\n\n')
+                # Idle past two keepalive intervals without events
+                self.assertEqual(await stream.__anext__(), ': keepalive\n\n')
+                self.assertEqual(await stream.__anext__(), ': keepalive\n\n')
+                self.assertEqual(len(broker._subscribers), 1)
+
+                broker.publish('{"event": "registration_created", "type": "webinar", "id": 1}')
+                chunk = await stream.__anext__()
+                while chunk == ': keepalive\n\n':
+                    chunk = await stream.__anext__()
+                self.assertEqual(
+                    chunk,
+                    'event: registration_created\n'
+                    'data: {"event": "registration_created", "type": "webinar", "id": 1}\n\n',
+                )
+            finally:
+                await stream.aclose()
+        self.assertEqual(len(broker._subscribers), 0)
+
+
+class SignedFileUrlTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_fragments_render_file_urls_per_use(self):
+        webinar = Webinar(pk=1, title='Intro', image='webinars/intro.png', updated_at=timezone.now())
+        context = {'request': Request(APIRequestFactory().get('/'))}
+        signed = (f'https://bucket.s3.amazonaws.com/webinars/intro.png?Expires={n}' for n in count())
+        with mock.patch.object(FieldFile, 'url', new_callable=mock.PropertyMock, side_effect=signed):
+            first = WebinarSerializer(webinar, context=context).data
+            second = WebinarSerializer(webinar, context=context).data
+            listed = WebinarSerializer([webinar], many=True, context=context).data[0]
+
+        # Served from the cached fragment, but each with a freshly signed URL
+        urls = [first['image'], second['image'], listed['image']]
+        self.assertEqual(len(set(urls)), 3)
+        self.assertTrue(all(url.startswith('https://bucket.s3.amazonaws.com/webinars/intro.png?Expires=') for url in urls))
+        self.assertEqual({**second, 'image': None}, {**first, 'image': None})
+        self.assertEqual({**listed, 'image': None}, {**first, 'image': None})
+        serializer = WebinarSerializer(webinar, context=context)
+        self.assertIsNone(cache.get(serializer.fragment_key(webinar))['image'])
+
+    @override_settings(USE_S3=True, AWS_QUERYSTRING_AUTH=True, AWS_QUERYSTRING_EXPIRE=600, CATALOG_CACHE_TIMEOUT=300)
+    def test_response_cache_timeout_stays_below_signed_url_expiry(self):
+        self.assertEqual(response_cache_timeout(), 150)
+        with self.settings(AWS_QUERYSTRING_AUTH=False):
+            self.assertEqual(response_cache_timeout(), 300)
+
+
+class ListETagTests(TestCase):
+    url = '/api/v1/webinars/registrations/'
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        staff = User.objects.create_user(email='staff@example.com', name='Staff', phone_number='5550101', is_staff=True)
+        webinar = Webinar.objects.create(title='Intro', description='', event_date=date(2030, 1, 1))
+        self.registration = WebinarRegistration.objects.create(webinar=webinar, user=staff)
+        self.client = APIClient()
+        self.client.force_authenticate(staff)
+
+    def test_body_etag_without_shared_cache(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # A write this process never saw bump a version for, as in another worker
+        WebinarRegistration.objects.filter(pk=self.registration.pk).update(status='accepted')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_version_etag_list_reads_primary(self):
+        routed = []
+
+        def db_for_read(router, model, **hints):
+            routed.append((model, _read_database.get()))
+            return 'default'
+
+        with mock.patch('core.conditional.shared_cache', return_value=True), \
+                mock.patch('core.db_router.choose_replica', return_value='replica0'), \
+                mock.patch.object(ReplicaRouter, 'db_for_read', autospec=True, side_effect=db_for_read):
+            response = self.client.get(self.url)
+            not_modified = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(not_modified.status_code, 304)
+        aliases = {alias for model, alias in routed if model is WebinarRegistration}
+        self.assertEqual(aliases, {None})
@@ -0,0 +1,335 @@
+"""
+Two-tier cache backend: an in-process LRU in front of Redis
+
+Reads are served from a bounded per-process LRU when possible and from
+Redis otherwise; values found in Redis are copied into the LRU for at
+most LOCAL_TIMEOUT seconds. Every write (set, add, incr, delete, clear)
+goes to Redis first and then publishes the written keys on a pub/sub
+channel, and each process evicts them from its LRU, so all gunicorn
+workers drop a changed key together.
+
+A process only serves from its LRU while its subscriber is connected;
+when the subscription drops the LRU is cleared and reads go straight to
+Redis until it is back. Keys that expire in Redis on their own are not
+broadcast, so the LRU may serve them for up to LOCAL_TIMEOUT seconds
+longer.
+
+Hit and miss counts of both tiers are kept per process and added to a
+Redis hash every STATS_INTERVAL seconds; see `manage.py cache_stats`.
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.tiered_cache.TieredRedisCache',
+            'LOCATION': REDIS_URL,
+            'OPTIONS': {'LOCAL_MAX_ENTRIES': 1000, 'LOCAL_TIMEOUT': 30},
+        }
+    }
+"""
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import Counter, OrderedDict
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.redis import RedisCache
+from redis.exceptions import RedisError
+
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class LocalTier:
+    """
+    Per-process LRU of pickled values shared by every thread
+
+    Django creates one cache backend per thread, so the LRU, its
+    counters and the invalidation subscriber live here, one per
+    (Redis location, channel) and process.
+    """
+
+    def __init__(self, channel, max_entries, timeout, stats_interval):
+        self.channel = channel
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.stats_interval = stats_interval
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires at, pickled value)
+        self._epoch = 0
+        self._subscribed = threading.Event()
+        self._listener_pid = None
+        self._totals = Counter()
+        self._pending = Counter()  # not yet added to the Redis hash
+        self._flushed_at = time.monotonic()
+
+    def start(self, client_factory):
+        """Start the invalidation subscriber in this process (again after a fork)"""
+        if self._listener_pid == os.getpid():
+            return
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+            self._subscribed.clear()
+            self._entries.clear()
+            self._totals.clear()
+            self._pending.clear()
+        thread = threading.Thread(target=self._listen, args=(client_factory,), name='tiered-cache-invalidation', daemon=True)
+        thread.start()
+
+    def _listen(self, client_factory):
+        while True:
+            try:
+                pubsub = client_factory().pubsub()
+                pubsub.subscribe(self.channel)
+                for message in pubsub.listen():
+                    if message['type'] == 'subscribe':
+                        # Messages published while disconnected were missed
+                        self.clear()
+                        self._subscribed.set()
+                    elif message['type'] == 'message':
+                        self.apply(message['data'])
+            except RedisError as e:
+                logger.warning("Cache invalidation subscriber disconnected: %s", e)
+            self._subscribed.clear()
+            self.clear()
+            time.sleep(1)
+
+    @property
+    def active(self):
+        return self.max_entries > 0 and self._subscribed.is_set()
+
+    @property
+    def epoch(self):
+        """Changes on every eviction; reads started in an older epoch are not stored"""
+        return self._epoch
+
+    def get(self, key):
+        if not self.active:
+            return _MISSING
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, pickled = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+        return pickle.loads(pickled)
+
+    def set(self, key, value, epoch):
+        if not self.active:
+            return
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            if epoch != self._epoch:
+                return
+            self._entries[key] = (time.monotonic() + self.timeout, pickled)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def evict(self, keys):
+        with self._lock:
+            self._epoch += 1
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+
+    def apply(self, message):
+        """Apply an invalidation message published by any process"""
+        payload = json.loads(message)
+        if payload.get('clear'):
+            self.clear()
+        else:
+            self.evict(payload['keys'])
+
+    def count(self, **counts):
+        with self._lock:
+            self._totals.update(counts)
+            self._pending.update(counts)
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._totals)
+            entries = len(self._entries)
+        return {
+            'local': {'hits': counters.get('local_hits', 0), 'misses': counters.get('local_misses', 0), 'entries': entries},
+            'redis': {'hits': counters.get('redis_hits', 0), 'misses': counters.get('redis_misses', 0)},
+        }
+
+    def take_counters(self, force=False):
+        """Counters gathered since the last call, once per stats interval"""
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._flushed_at < self.stats_interval:
+                return None
+            self._flushed_at = now
+            counters, self._pending = self._pending, Counter()
+        return counters
+
+
+_tiers = {}
+_tiers_lock = threading.Lock()
+
+
+def _local_tier(location, channel, max_entries, timeout, stats_interval):
+    key = (location, channel)
+    with _tiers_lock:
+        if key not in _tiers:
+            _tiers[key] = LocalTier(channel, max_entries, timeout, stats_interval)
+        return _tiers[key]
+
+
+class TieredRedisCache(RedisCache):
+    """RedisCache with a per-process LRU kept coherent over pub/sub"""
+
+    def __init__(self, server, params):
+        params = dict(params)
+        options = dict(params.get('OPTIONS', {}))
+        max_entries = int(options.pop('LOCAL_MAX_ENTRIES', 1000))
+        local_timeout = int(options.pop('LOCAL_TIMEOUT', 30))
+        stats_interval = int(options.pop('STATS_INTERVAL', 10))
+        params['OPTIONS'] = options
+        super().__init__(server, params)
+        self._channel = f'{self.key_prefix}:cache:invalidate'
+        self._stats_key = f'{self.key_prefix}:cache:tier-stats'
+        self._local = _local_tier(tuple(self._servers), self._channel, max_entries, local_timeout, stats_interval)
+
+    def _write_client(self):
+        return self._cache.get_client(write=True)
+
+    def _tier(self):
+        self._local.start(self._write_client)
+        return self._local
+
+    def _invalidate(self, keys):
+        self._local.evict(keys)
+        self._write_client().publish(self._channel, json.dumps({'keys': list(keys)}))
+
+    def _count(self, **counts):
+        self._local.count(**counts)
+        counters = self._local.take_counters()
+        if counters:
+            self._flush_counters(counters)
+
+    def _flush_counters(self, counters):
+        pipeline = self._write_client().pipeline()
+        for name, value in counters.items():
+            pipeline.hincrby(self._stats_key, name, value)
+        pipeline.execute()
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        tier = self._tier()
+        value = tier.get(key)
+        if value is not _MISSING:
+            self._count(local_hits=1)
+            return value
+
+        epoch = tier.epoch
+        value = self._cache.get(key, _MISSING)
+        if value is _MISSING:
+            self._count(local_misses=1, redis_misses=1)
+            return default
+        tier.set(key, value, epoch)
+        self._count(local_misses=1, redis_hits=1)
+        return value
+
+    def get_many(self, keys, version=None):
+        key_map = {self.make_and_validate_key(key, version=version): key for key in keys}
+        tier = self._tier()
+        found = {}
+        for key in key_map:
+            value = tier.get(key)
+            if value is not _MISSING:
+                found[key] = value
+
+        remaining = [key for key in key_map if key not in found]
+        fetched = {}
+        if remaining:
+            epoch = tier.epoch
+            fetched = self._cache.get_many(remaining)
+            for key, value in fetched.items():
+                tier.set(key, value, epoch)
+        self._count(
+            local_hits=len(found), local_misses=len(remaining),
+            redis_hits=len(fetched), redis_misses=len(remaining) - len(fetched),
+        )
+        found.update(fetched)
+        return {key_map[key]: value for key, value in found.items()}
+
+    def has_key(self, key, version=None):
+        if self._tier().get(self.make_and_validate_key(key, version=version)) is not _MISSING:
+            return True
+        return super().has_key(key, version=version)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        super().set(key, value, timeout, version=version)
+        self._invalidate([self.make_and_validate_key(key, version=version)])
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = super().add(key, value, timeout, version=version)
+        if added:
+            self._invalidate([self.make_and_validate_key(key, version=version)])
+        return added
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = super().set_many(data, timeout, version=version)
+        if data:
+            self._invalidate([self.make_and_validate_key(key, version=version) for key in data])
+        return failed
+
+    def incr(self, key, delta=1, version=None):
+        value = super().incr(key, delta, version=version)
+        self._invalidate([self.make_and_validate_key(key, version=version)])
+        return value
+
+    def delete(self, key, version=None):
+        deleted = super().delete(key, version=version)
+        self._invalidate([self.make_and_validate_key(key, version=version)])
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        super().delete_many(keys, version=version)
+        if keys:
+            self._invalidate([self.make_and_validate_key(key, version=version) for key in keys])
+
+    def clear(self):
+        cleared = super().clear()
+        self._local.clear()
+        self._write_client().publish(self._channel, json.dumps({'clear': True}))
+        return cleared
+
+    def tier_stats(self):
+        """Hit/miss counts and LRU size of this process"""
+        return self._local.stats()
+
+    def cluster_tier_stats(self):
+        """Hit/miss counts summed over every process, including this one's pending counts"""
+        counters = self._local.take_counters(force=True)
+        if counters:
+            self._flush_counters(counters)
+        totals = {
+            name.decode(): int(value)
+            for name, value in self._write_client().hgetall(self._stats_key).items()
+        }
+        return {
+            tier: {
+                'hits': totals.get(f'{tier}_hits', 0),
+                'misses': totals.get(f'{tier}_misses', 0),
+            }
+            for tier in ('local', 'redis')
+        }
+
+    def reset_tier_stats(self):
+        self._local.take_counters(force=True)
+        self._write_client().delete(self._stats_key)
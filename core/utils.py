@@ -3,7 +3,6 @@ Utility functions for image upload and validation
 """
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from PIL import Image
 from io import BytesIO
 import os
 
@@ -38,6 +37,8 @@ def validate_image_file(file):
         )
     
     # Verify it's a valid image
+    # PIL is imported on first use so it stays out of every cold start
+    from PIL import Image
     try:
         img = Image.open(file)
         img.verify()
@@ -58,6 +59,8 @@ def optimize_image(image_file, max_width=1920, max_height=1080, quality=85):
     Returns:
         BytesIO object containing optimized image
     """
+    from PIL import Image
+
     img = Image.open(image_file)
     
     # Convert RGBA to RGB if necessary (for JPEG compatibility)
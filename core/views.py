@@ -1,20 +1,77 @@
+import json
+import time
+from datetime import date, timedelta
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
 from rest_framework.viewsets import ViewSet
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed
 from core.stats import (
+    aget_dashboard_stats,
+    aget_dashboard_stats_simple,
     get_dashboard_stats,
     get_dashboard_stats_simple,
     get_registration_status_stats,
     get_past_registration_stats,
-    get_recent_registrations
+    get_recent_registrations,
+    RECENT_REGISTRATION_TYPES
 )
+from core.cache import aget_cached_stats, get_cached_stats
+from core.conditional import data_etag, not_modified_response, set_validators
+from core.events import get_broker
+from core.rollups import GRANULARITIES
+from core.search import SEARCHABLE_MODELS, search_catalogs
 from core.serializers import DashboardStatsSerializer
 
 
+MAX_PAST_REGISTRATION_DAYS = 366 * 5
+MAX_RECENT_REGISTRATIONS = 50
+MAX_SEARCH_RESULTS = 50
+
+
+def parse_before_cursor(value):
+    """Parse a `<timestamp>,<type>,<id>` keyset cursor, or return None if malformed"""
+    parts = value.rsplit(',', 2)
+    if len(parts) != 3:
+        return None
+    timestamp, type_name, pk = (part.strip() for part in parts)
+    # A literal '+' in the UTC offset arrives as a space when not URL-encoded
+    timestamp = parse_datetime(timestamp.replace(' ', '+'))
+    if timestamp is None or type_name not in RECENT_REGISTRATION_TYPES or not pk.isdigit():
+        return None
+    if timezone.is_naive(timestamp):
+        timestamp = timezone.make_aware(timestamp)
+    return timestamp, type_name, int(pk)
+
+
+def cached_response(request, stats, cached, serializer_class=None):
+    """
+    Build a response reporting whether it came from the stats cache
+    The ETag is a digest of the stats, so unchanged stats answer 304.
+    """
+    etag = data_etag(stats)
+    response = not_modified_response(request, etag)
+    if response is None:
+        response = Response(serializer_class(stats).data if serializer_class else stats)
+        set_validators(response, etag)
+    response['X-Cache'] = 'HIT' if cached else 'MISS'
+    return response
+
+
 class StatsViewSet(ViewSet):
     """
     ViewSet for dashboard statistics endpoints
+    Results are cached and flagged with an X-Cache: HIT/MISS header, and
+    carry an ETag for conditional requests. dashboard and comprehensive
+    also have async handlers that run their queries concurrently.
     """
     permission_classes = [IsAuthenticated, IsAdminUser]
 
@@ -24,34 +81,90 @@ class StatsViewSet(ViewSet):
         Get basic dashboard statistics with active counts
         Returns: internships, webinars, memberships counts
         """
-        stats = get_dashboard_stats_simple()
-        return Response(stats)
+        stats, cached = get_cached_stats('dashboard', get_dashboard_stats_simple)
+        return cached_response(request, stats, cached)
+
+    async def adashboard(self, request):
+        stats, cached = await aget_cached_stats('dashboard', aget_dashboard_stats_simple)
+        return cached_response(request, stats, cached)
 
     @action(detail=False, methods=['get'])
     def past_registrations(self, request):
         """
-        Get registration statistics for past 10 days
-        Groups by date and registration type
-        Returns: list of days with webinar and internship counts
+        Get registration statistics over time, read from the daily rollups
+        Query params: from, to (YYYY-MM-DD, default: the past 10 days),
+        granularity (day/week/month, default: day)
+        Returns: list of periods with registration, new user and revenue totals
         """
-        stats = get_past_registration_stats()
-        return Response(stats)
+        granularity = request.query_params.get('granularity', 'day')
+        if granularity not in GRANULARITIES:
+            return Response(
+                {'error': f'Invalid granularity. Must be one of: {", ".join(GRANULARITIES)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            end = date.fromisoformat(request.query_params['to']) if 'to' in request.query_params else timezone.localdate()
+            start = date.fromisoformat(request.query_params['from']) if 'from' in request.query_params else end - timedelta(days=9)
+        except ValueError:
+            return Response(
+                {'error': 'from and to must be dates in YYYY-MM-DD format.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if start > end:
+            return Response(
+                {'error': 'from must not be after to.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if (end - start).days >= MAX_PAST_REGISTRATION_DAYS:
+            return Response(
+                {'error': f'Date range cannot exceed {MAX_PAST_REGISTRATION_DAYS} days.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        stats, cached = get_cached_stats(
+            'past_registrations',
+            get_past_registration_stats,
+            start=start,
+            end=end,
+            granularity=granularity,
+        )
+        return cached_response(request, stats, cached)
 
     @action(detail=False, methods=['get'])
     def recent_registrations(self, request):
         """
-        Get recent registrations across webinars and internships
-        Query params: limit (default: 5)
+        Get recent registrations across webinars, internships and memberships
+        Query params: limit (default: 5, max: 50),
+        before (`<created_at>,<type>,<id>` of the last row seen, to load older rows)
         """
-        limit = int(request.query_params.get('limit', 5))
-        registrations = get_recent_registrations(limit=limit)
-        return Response(registrations)
+        limit = request.query_params.get('limit', '5')
+        if not limit.isdigit() or not 1 <= int(limit) <= MAX_RECENT_REGISTRATIONS:
+            return Response(
+                {'error': f'limit must be an integer between 1 and {MAX_RECENT_REGISTRATIONS}.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        before = None
+        if 'before' in request.query_params:
+            before = parse_before_cursor(request.query_params['before'])
+            if before is None:
+                return Response(
+                    {'error': 'before must be in <created_at>,<type>,<id> format.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        registrations, cached = get_cached_stats(
+            'recent_registrations', get_recent_registrations, limit=int(limit), before=before
+        )
+        return cached_response(request, registrations, cached)
 
     @action(detail=False, methods=['get'])
     def registration_status(self, request):
         """Get registration status counts for internship, webinar, and membership"""
-        stats = get_registration_status_stats()
-        return Response(stats)
+        stats, cached = get_cached_stats('registration_status', get_registration_status_stats)
+        return cached_response(request, stats, cached)
 
     @action(detail=False, methods=['get'])
     def comprehensive(self, request):
@@ -59,6 +172,98 @@ class StatsViewSet(ViewSet):
         Get comprehensive dashboard statistics
         Includes detailed breakdowns of all modules
         """
-        stats = get_dashboard_stats()
-        serializer = DashboardStatsSerializer(stats)
-        return Response(serializer.data)
+        stats, cached = get_cached_stats('comprehensive', get_dashboard_stats)
+        return cached_response(request, stats, cached, DashboardStatsSerializer)
+
+    async def acomprehensive(self, request):
+        stats, cached = await aget_cached_stats('comprehensive', aget_dashboard_stats)
+        return cached_response(request, stats, cached, DashboardStatsSerializer)
+
+
+class SearchViewSet(ViewSet):
+    """Ranked full-text search across webinars, internships and memberships"""
+    permission_classes = [AllowAny]
+
+    def list(self, request):
+        """
+        Query params: q (websearch syntax: words, "phrases", -excluded, or),
+        limit (default: 20, max: 50), type (comma-separated catalog types)
+        """
+        q = request.query_params.get('q', '').strip()
+        if not q:
+            return Response({'error': 'q is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        limit = request.query_params.get('limit', '20')
+        if not limit.isdigit() or not 1 <= int(limit) <= MAX_SEARCH_RESULTS:
+            return Response(
+                {'error': f'limit must be an integer between 1 and {MAX_SEARCH_RESULTS}.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        types = None
+        if request.query_params.get('type'):
+            types = set(request.query_params['type'].split(','))
+            unknown = types - set(SEARCHABLE_MODELS)
+            if unknown:
+                return Response(
+                    {'error': f"type must be one of: {', '.join(SEARCHABLE_MODELS)}."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        return Response({'query': q, 'results': search_catalogs(q, limit=int(limit), types=types)})
+
+
+def authenticate_stream_request(request):
+    """
+    Resolve the JWT user of a stream request
+    EventSource cannot set headers, so a ?token= query param is accepted too
+    """
+    authenticator = JWTAuthentication()
+    try:
+        token = request.GET.get('token')
+        if token:
+            return authenticator.get_user(authenticator.get_validated_token(token))
+        result = authenticator.authenticate(request)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    return result[0] if result else None
+
+
+async def stats_event_stream():
+    """Relay published stats events as SSE messages, with keepalives"""
+    yield 'retry: 5000\n\n'
+    # Bounded lifetime: the client reconnects, and abandoned streams end
+    deadline = time.monotonic() + settings.STATS_STREAM_MAX_AGE
+    async with get_broker().subscribe() as receive:
+        while time.monotonic() < deadline:
+            message = await receive(timeout=settings.STATS_STREAM_KEEPALIVE)
+            if message is None:
+                yield ': keepalive\n\n'
+                continue
+            event = json.loads(message)['event']
+            yield f'event: {event}\ndata: {message}\n\n'
+
+
+async def stats_stream(request):
+    """
+    Server-Sent Events stream of dashboard stat deltas (staff only)
+    Events: registration_created, registration_status_changed, payment_completed
+    Each carries the registration type, id and the bucket deltas to apply.
+    Served by the ASGI application (liture/asgi.py).
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {'error': 'The stats stream is only available on the ASGI server.'},
+            status=503
+        )
+
+    user = await sync_to_async(authenticate_stream_request)(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+    if not user.is_staff:
+        return JsonResponse({'detail': 'You do not have permission to perform this action.'}, status=403)
+
+    response = StreamingHttpResponse(stats_event_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
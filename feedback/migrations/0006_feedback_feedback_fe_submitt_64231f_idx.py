@@ -0,0 +1,17 @@
+# Generated by Django 4.2.27 on 2026-10-18 17:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0005_remove_feedback_feedback_fe_rating_c20163_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['-submitted_at', '-id'], name='feedback_fe_submitt_64231f_idx'),
+        ),
+    ]
@@ -39,6 +39,7 @@ class Feedback(models.Model):
         indexes = [
             models.Index(fields=['feedback_type', '-submitted_at']),
             models.Index(fields=['user', 'feedback_type']),
+            models.Index(fields=['-submitted_at', '-id']),  # keyset pagination
         ]
 
     def __str__(self):
@@ -9,9 +9,13 @@ from .serializers import (
     FeedbackCreateSerializer
 )
 from users.pagination import CustomPagination
+from core.prefetch import EagerLoadingMixin
+from core.compiled_serializers import CompiledListMixin
+from core.sparse_fields import SparseFieldsMixin
+from core.conditional import ConditionalGetMixin
 
 
-class FeedbackViewSet(viewsets.ModelViewSet):
+class FeedbackViewSet(ConditionalGetMixin, SparseFieldsMixin, CompiledListMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Feedback.objects.all()
     serializer_class = FeedbackSerializer
     pagination_class = CustomPagination
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.27 on 2026-10-18 17:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('internships', '0002_remove_internshipregistration_resume_link_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='internshipregistration',
+            index=models.Index(fields=['applied_at'], name='internships_applied_883961_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.27 on 2026-10-18 18:10
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+from django.contrib.postgres.search import SearchVector
+
+
+def populate_search_vector(apps, schema_editor):
+    Internship = apps.get_model('internships', 'Internship')
+    Internship.objects.update(search_vector=(
+        SearchVector('title', weight='A', config='english')
+        + SearchVector('description', weight='B', config='english')
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('internships', '0003_internshipregistration_internships_applied_883961_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='internship',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='internship',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='internships_search__5eb6c8_gin'),
+        ),
+        migrations.RunPython(populate_search_vector, migrations.RunPython.noop),
+    ]
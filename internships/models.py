@@ -1,4 +1,6 @@
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from users.models import User
 from django.utils.text import slugify
 import uuid
@@ -19,9 +21,13 @@ class Internship(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     slug = models.SlugField(unique=True, blank=True, null=True)
+    search_vector = SearchVectorField(null=True, editable=False)  # see core.search
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            GinIndex(fields=['search_vector']),
+        ]
 
     def __str__(self):
         return self.title
@@ -60,6 +66,7 @@ class InternshipRegistration(models.Model):
         indexes = [
             models.Index(fields=['status', '-applied_at']),
             models.Index(fields=['user', 'status']),
+            models.Index(fields=['applied_at']),  # daily stats rollups
         ]
 
     def __str__(self):
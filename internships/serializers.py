@@ -2,13 +2,15 @@ from rest_framework import serializers
 from .models import Internship, InternshipRegistration
 from users.serializers import UserSerializer, UserSimpleSerializer
 from core.utils import validate_image_file
+from core.fragments import FragmentCacheMixin, FragmentListSerializer
 from django.core.exceptions import ValidationError
 
-class InternshipSerializer(serializers.ModelSerializer):
+class InternshipSerializer(FragmentCacheMixin, serializers.ModelSerializer):
     image = serializers.ImageField(required=False, allow_null=True)
     
     class Meta:
         model = Internship
+        list_serializer_class = FragmentListSerializer
         fields = ['id', 'image', 'title', 'description', 'event_date', 'is_active', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
     
@@ -31,6 +33,7 @@ class InternshipRegistrationSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = InternshipRegistration
+        list_serializer_class = FragmentListSerializer
         fields = [
             'id', 'internship', 'internship_id', 'user', 'user_id', 
             'resume', 'reason', 'status', 'applied_at', 'status_updated_at', 
@@ -49,6 +52,7 @@ class InternshipRegistrationListSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = InternshipRegistration
+        list_serializer_class = FragmentListSerializer
         fields = ['id', 'internship', 'user', 'status', 'applied_at', 'reason']
 
 
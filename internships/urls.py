@@ -1,5 +1,7 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from core.async_views import async_routes
 from .views import InternshipViewSet, InternshipRegistrationViewSet
 
 router = DefaultRouter()
@@ -8,4 +10,8 @@ router.register(r'registrations', InternshipRegistrationViewSet, basename='inter
 
 urlpatterns = [
     path('', include(router.urls)),
-]
\ No newline at end of file
+]
+
+if settings.ASYNC_VIEWS:
+    # Served ahead of the router's sync routes under ASGI
+    urlpatterns = async_routes('list', InternshipViewSet, 'internship') + urlpatterns
@@ -2,11 +2,12 @@ from rest_framework import viewsets, status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.parsers import MultiPartParser, FormParser,JSONParser
+from rest_framework.parsers import MultiPartParser, FormParser
 from django_filters.rest_framework import DjangoFilterBackend
 from django.core.mail import EmailMessage
 from django.template.loader import render_to_string
 from django.conf import settings
+from django.db import transaction
 from .models import Internship, InternshipRegistration
 from .serializers import (
     InternshipSerializer, 
@@ -16,16 +17,26 @@ from .serializers import (
 )
 from .filters import InternshipFilter
 from users.pagination import CustomPagination
+from core.prefetch import EagerLoadingMixin
+from core.compiled_serializers import CompiledListMixin
+from core.sparse_fields import SparseFieldsMixin
+from core.conditional import ConditionalGetMixin
+from core.counters import CountedWriteMixin
+from core.response_cache import ResponseCacheMixin
+from core.async_views import AsyncReadMixin
+from core.parsers import ORJSONParser
+from core.sideload import SideloadMixin
 from users.permissions import IsStaffOrSuperAdmin
+from core.events import publish_registration_created, publish_status_changed
 from django.utils import timezone
 
-class InternshipViewSet(viewsets.ModelViewSet):
+class InternshipViewSet(ResponseCacheMixin, ConditionalGetMixin, SparseFieldsMixin, CompiledListMixin, AsyncReadMixin, viewsets.ModelViewSet):
     queryset = Internship.objects.filter()
     serializer_class = InternshipSerializer
     pagination_class = CustomPagination
     filter_backends = [DjangoFilterBackend]
     filterset_class = InternshipFilter
-    parser_classes = (MultiPartParser, FormParser,JSONParser)
+    parser_classes = (MultiPartParser, FormParser,ORJSONParser)
 
     def get_permissions(self):
         if self.action in ['list', 'retrieve']:
@@ -35,12 +46,12 @@ class InternshipViewSet(viewsets.ModelViewSet):
         return [permission() for permission in permission_classes]
 
 
-class InternshipRegistrationViewSet(viewsets.ModelViewSet):
+class InternshipRegistrationViewSet(CountedWriteMixin, ConditionalGetMixin, SideloadMixin, SparseFieldsMixin, CompiledListMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = InternshipRegistrationSerializer
     pagination_class = CustomPagination
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['status', 'user', 'internship']
-    parser_classes = (MultiPartParser, FormParser,JSONParser)
+    parser_classes = (MultiPartParser, FormParser,ORJSONParser)
 
     def get_queryset(self):
         user = self.request.user
@@ -63,6 +74,7 @@ class InternshipRegistrationViewSet(viewsets.ModelViewSet):
             return InternshipApplicationReviewSerializer
         return InternshipRegistrationSerializer
 
+    @transaction.atomic
     def create(self, request, *args, **kwargs):
         """Apply for internship"""
         data = request.data.copy()
@@ -78,6 +90,7 @@ class InternshipRegistrationViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(data=data)
         serializer.is_valid(raise_exception=True)
         registration = serializer.save(user=request.user)
+        publish_registration_created('internship', registration)
 
         user = registration.user
         html_content = render_to_string('emails/registration.html', {
@@ -100,6 +113,7 @@ class InternshipRegistrationViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     @action(detail=True, methods=['patch'], permission_classes=[IsAuthenticated, IsStaffOrSuperAdmin])
+    @transaction.atomic
     def change_status(self, request, pk=None):
         """Update application status"""
         registration = self.get_object()
@@ -120,12 +134,14 @@ class InternshipRegistrationViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        old_status = registration.status
         if new_status:
             registration.status = new_status
         if rejection_reason:
             registration.rejection_reason = rejection_reason
         
         registration.save()
+        publish_status_changed('internship', registration, old_status)
 
         if registration.status in ['accepted', 'rejected']:
             user = registration.user
@@ -156,14 +172,16 @@ class InternshipRegistrationViewSet(viewsets.ModelViewSet):
     def add_review(self, request, pk=None):
         """Add review/feedback to application"""
         registration = self.get_object()
+        old_status = registration.status
         serializer = InternshipApplicationReviewSerializer(registration, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         serializer.save()
+        publish_status_changed('internship', registration, old_status)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated, IsStaffOrSuperAdmin])
     def pending_applications(self, request):
         """Get all pending applications"""
-        pending = self.get_queryset().filter(status='pending')
+        pending = self.eager_load(self.get_queryset().filter(status='pending'))
         serializer = self.get_serializer(pending, many=True)
         return Response(serializer.data)
@@ -1,3 +1,10 @@
-from .celery import app as celery_app
+# The Celery app is loaded on first access (celery -A liture, or CoreConfig.ready()
+# unless LAZY_CELERY_APP is set) rather than with every import of the project
+def __getattr__(name):
+    if name == 'celery_app':
+        from .celery import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = ("celery_app",)
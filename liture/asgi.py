@@ -2,6 +2,15 @@
 ASGI config for liture project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Long-lived endpoints such as the /api/v1/stats/stream/ Server-Sent Events
+feed must be served from here, e.g.:
+
+    uvicorn liture.asgi:application
+    gunicorn liture.asgi:application -k uvicorn.workers.UvicornWorker
+
+Set ASYNC_VIEWS=True here to also serve the catalog list/retrieve and
+stats dashboard/comprehensive endpoints through their async handlers
+(core.async_views); `manage.py benchmark_asgi` compares the two servers.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
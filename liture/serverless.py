@@ -0,0 +1,20 @@
+"""
+WSGI entry point for serverless deployments (vercel.json)
+
+Uses the lean liture.settings_serverless profile and fills the URL
+resolver while the function initializes, so the first request does not
+compile the URL patterns. `python manage.py profile_startup` compares
+its cold start with liture.wsgi.
+"""
+
+import os
+
+from django.core.wsgi import get_wsgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'liture.settings_serverless')
+
+application = get_wsgi_application()
+
+from core.startup import warm_url_resolver  # noqa: E402
+
+warm_url_resolver()
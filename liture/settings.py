@@ -3,6 +3,7 @@ from pathlib import Path
 from dotenv import load_dotenv
 from datetime import timedelta
 import dj_database_url
+from corsheaders.defaults import default_headers
 
 load_dotenv(dotenv_path=Path(__file__).resolve().parent.parent / '.env')
 
@@ -21,6 +22,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework.authtoken',
     'corsheaders',
@@ -31,6 +33,7 @@ INSTALLED_APPS = [
     "webinars",
     "memberships",
     "feedback",
+    "core",
     "anymail",
     'django_extensions',
 ]
@@ -55,6 +58,59 @@ CELERY_REDIS_BACKEND_USE_SSL = {
     'ssl_cert_reqs': 'CERT_NONE',
 }
 
+CELERY_BEAT_SCHEDULE = {
+    # Recompute today's and yesterday's stats rollups from the source tables
+    'rollup-daily-stats': {
+        'task': 'core.tasks.rollup_daily_stats',
+        'schedule': timedelta(hours=1),
+    },
+}
+
+# Load the Celery app only when first used instead of at startup (liture.settings_serverless)
+LAZY_CELERY_APP = False
+
+# Cache settings: Redis behind a per-process LRU when REDIS_URL is set, per-process memory otherwise
+REDIS_URL = os.getenv('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.tiered_cache.TieredRedisCache',
+            'LOCATION': REDIS_URL,
+            'OPTIONS': {
+                'LOCAL_MAX_ENTRIES': int(os.getenv('CACHE_LOCAL_MAX_ENTRIES', '1000')),  # 0 disables the LRU
+                'LOCAL_TIMEOUT': int(os.getenv('CACHE_LOCAL_TIMEOUT', '30')),  # seconds
+            },
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+STATS_CACHE_TIMEOUT = int(os.getenv('STATS_CACHE_TIMEOUT', '300'))  # seconds
+
+# Stampede protection (core.stampede): how long expired entries are still served
+# while one worker recomputes them, and how long that worker may hold the refresh lock
+CACHE_STALE_TTL = int(os.getenv('CACHE_STALE_TTL', '300'))  # seconds
+CACHE_REFRESH_LOCK_TIMEOUT = int(os.getenv('CACHE_REFRESH_LOCK_TIMEOUT', '30'))  # seconds
+
+# Public catalog list/retrieve responses: server-side cache and edge (s-maxage) lifetimes
+CATALOG_CACHE_TIMEOUT = int(os.getenv('CATALOG_CACHE_TIMEOUT', '300'))  # seconds
+CATALOG_CACHE_S_MAXAGE = int(os.getenv('CATALOG_CACHE_S_MAXAGE', '60'))  # seconds
+
+# Cached serializer output per object, keyed on its updated_at
+FRAGMENT_CACHE_TIMEOUT = int(os.getenv('FRAGMENT_CACHE_TIMEOUT', '3600'))  # seconds
+
+# Live stats stream (Server-Sent Events)
+STATS_STREAM_KEEPALIVE = 15  # seconds between keepalive comments
+STATS_STREAM_MAX_AGE = int(os.getenv('STATS_STREAM_MAX_AGE', '300'))  # seconds before clients reconnect
+
+# Async catalog list/retrieve and stats views (core.async_views); enable only when served through liture.asgi
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', 'False').lower() == 'true'
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -81,15 +137,20 @@ LOGGING = {
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.db_router.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.db_metrics.DatabaseConnectionMetricsMiddleware',
 ]
 
 CORS_ORIGIN_ALLOWED_ALL = os.getenv('CORS_ORIGIN_ALLOWED_ALL', 'True').lower() == 'true'
+# Read-your-writes window of core.db_router, for clients that cannot rely on cookies
+CORS_ALLOW_HEADERS = (*default_headers, 'x-db-primary-until')
+CORS_EXPOSE_HEADERS = ['X-DB-Primary-Until']
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173", 
      "http://localhost:3000",
@@ -123,7 +184,37 @@ DATABASES = {
     }
 }
 
-DATABASES["default"] = dj_database_url.parse(os.getenv("DATABASE_URL"))
+# Persistent connections, checked before reuse; CONN_MAX_AGE=0 closes them after every request
+CONN_MAX_AGE = int(os.getenv('CONN_MAX_AGE', '60'))  # seconds
+CONN_HEALTH_CHECKS = os.getenv('CONN_HEALTH_CHECKS', 'True').lower() == 'true'
+# DATABASE_URL points at PgBouncer in transaction pooling mode
+PGBOUNCER_TRANSACTION_POOLING = os.getenv('PGBOUNCER_TRANSACTION_POOLING', 'False').lower() == 'true'
+
+
+def database_config(url):
+    config = dj_database_url.parse(url, conn_max_age=CONN_MAX_AGE, conn_health_checks=CONN_HEALTH_CHECKS)
+    if config["ENGINE"] == 'django.db.backends.postgresql':
+        # Same backend, timing new connections for core.db_metrics
+        config["ENGINE"] = 'core.db'
+    if PGBOUNCER_TRANSACTION_POOLING:
+        # Consecutive transactions may run on different server connections, so
+        # cursors must not outlive their transaction
+        config["DISABLE_SERVER_SIDE_CURSORS"] = True
+    return config
+
+
+DATABASES["default"] = database_config(os.getenv("DATABASE_URL"))
+
+# Read replicas (comma-separated URLs) for safe-method requests; see core.db_router
+DATABASE_REPLICAS = []
+for index, url in enumerate(filter(None, os.getenv('DATABASE_REPLICA_URLS', '').split(','))):
+    DATABASES[f'replica{index}'] = {**database_config(url.strip()), 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(f'replica{index}')
+
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+REPLICA_MAX_LAG = float(os.getenv('REPLICA_MAX_LAG', '5'))  # seconds behind the primary before a replica is skipped
+REPLICA_LAG_CHECK_INTERVAL = int(os.getenv('REPLICA_LAG_CHECK_INTERVAL', '5'))  # seconds
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', '10'))  # primary reads after a client's write
 
 
 SIMPLE_JWT = {
@@ -166,9 +257,21 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'PAGE_SIZE': 5,
 }
 
+# Page-number lists count exactly up to this many rows and estimate beyond it
+PAGINATION_EXACT_COUNT_THRESHOLD = int(os.getenv('PAGINATION_EXACT_COUNT_THRESHOLD', '10000'))
+
 USE_S3 = os.getenv('USE_S3', 'True').lower() == 'true'
 
 if USE_S3:
@@ -178,6 +281,9 @@ if USE_S3:
     AWS_S3_REGION_NAME = os.getenv('AWS_S3_REGION_NAME', 'us-east-1')
     AWS_S3_CUSTOM_DOMAIN = f"{AWS_STORAGE_BUCKET_NAME}.s3.amazonaws.com"
     AWS_DEFAULT_ACL = None
+    # File URLs are signed and expire; cached catalog responses stay well below this
+    AWS_QUERYSTRING_AUTH = os.getenv('AWS_QUERYSTRING_AUTH', 'True').lower() == 'true'
+    AWS_QUERYSTRING_EXPIRE = int(os.getenv('AWS_QUERYSTRING_EXPIRE', '3600'))  # seconds
     DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
 else:
     DEFAULT_FILE_STORAGE = 'django.core.files.storage.FileSystemStorage'
@@ -0,0 +1,17 @@
+"""
+Settings for the serverless (Vercel) entry point, liture/serverless.py
+
+Every cold start imports the whole project, so this profile leaves out
+what a request never needs: django_extensions (development commands) and
+anymail (system checks and webhooks; mail goes through EMAIL_BACKEND),
+and loads the Celery app only when first used. PIL, boto3 (S3 storage)
+and redis are imported on first use in every profile.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in ('django_extensions', 'anymail')]
+
+LAZY_CELERY_APP = True
+
+WSGI_APPLICATION = 'liture.serverless.application'
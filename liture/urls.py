@@ -17,15 +17,18 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from core.views import StatsViewSet
+from core.async_views import async_action_routes
+from core.views import StatsViewSet, SearchViewSet, stats_stream
 from django.conf import settings
 from django.conf.urls.static import static
 
 router = DefaultRouter()
 router.register(r'stats', StatsViewSet, basename='stats')
+router.register(r'search', SearchViewSet, basename='search')
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/v1/stats/stream/', stats_stream, name='stats-stream'),
     path('api/v1/', include(router.urls)),
     path('api/v1/users/', include('users.urls')),
     path('api/v1/auth/', include('authentication.urls')),
@@ -33,4 +36,9 @@ urlpatterns = [
     path('api/v1/webinars/', include('webinars.urls')),
     path('api/v1/memberships/', include('memberships.urls')),
     path('api/v1/feedbacks/', include('feedback.urls')),
-] + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file
+] + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+
+if settings.ASYNC_VIEWS:
+    urlpatterns = [
+        path('api/v1/', include(async_action_routes('stats', StatsViewSet, 'stats', ['dashboard', 'comprehensive']))),
+    ] + urlpatterns
@@ -1,7 +1,9 @@
 import django_filters
 from .models import Membership
+from core.search import search_queryset
 
 class MembershipFilter(django_filters.FilterSet):
+    q = django_filters.CharFilter(method='filter_search')  # full-text, ranked
     name = django_filters.CharFilter(lookup_expr='icontains')  # partial search
     description = django_filters.CharFilter(lookup_expr='icontains')
     is_active = django_filters.BooleanFilter()
@@ -9,4 +11,7 @@ class MembershipFilter(django_filters.FilterSet):
 
     class Meta:
         model = Membership
-        fields = ['name', 'description', 'is_active', 'created_at']
+        fields = ['q', 'name', 'description', 'is_active', 'created_at']
+
+    def filter_search(self, queryset, name, value):
+        return search_queryset(queryset, value)
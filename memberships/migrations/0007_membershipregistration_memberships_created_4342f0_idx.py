@@ -0,0 +1,17 @@
+# Generated by Django 4.2.27 on 2026-10-18 17:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memberships', '0006_membershipregistration_rejection_reason'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='membershipregistration',
+            index=models.Index(fields=['created_at'], name='memberships_created_4342f0_idx'),
+        ),
+    ]
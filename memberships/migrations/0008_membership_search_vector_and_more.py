@@ -0,0 +1,36 @@
+# Generated by Django 4.2.27 on 2026-10-18 18:10
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+from django.contrib.postgres.search import SearchVector
+from django.db.models import F, Func, TextField, Value
+
+
+def populate_search_vector(apps, schema_editor):
+    Membership = apps.get_model('memberships', 'Membership')
+    Membership.objects.update(search_vector=(
+        SearchVector('name', weight='A', config='english')
+        + SearchVector('description', weight='B', config='english')
+        + SearchVector(Func(F('benefits'), Value(' '), function='array_to_string', output_field=TextField()), weight='C', config='english')
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memberships', '0007_membershipregistration_memberships_created_4342f0_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='membership',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='membership',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='memberships_search__84bbdc_gin'),
+        ),
+        migrations.RunPython(populate_search_vector, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,12 @@
 from rest_framework import serializers
 from .models import Membership, MembershipRegistration
 from users.serializers import UserSerializer, UserSimpleSerializer
+from core.fragments import FragmentCacheMixin, FragmentListSerializer
 
-class MembershipSerializer(serializers.ModelSerializer):
+class MembershipSerializer(FragmentCacheMixin, serializers.ModelSerializer):
     class Meta:
         model = Membership
+        list_serializer_class = FragmentListSerializer
         fields = ['id', 'name', 'description', 'benefits', 'is_active', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
 
@@ -17,6 +19,7 @@ class MembershipRegistrationSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = MembershipRegistration
+        list_serializer_class = FragmentListSerializer
         fields = [
             'id', 'user', 'user_id', 'membership', 'membership_id', 'start_date', 
             'is_active', 'status', 'payment_status', 'payment_amount', 'payment_method',
@@ -35,4 +38,5 @@ class MembershipRegistrationListSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = MembershipRegistration
+        list_serializer_class = FragmentListSerializer
         fields = ['id', 'user', 'membership', 'start_date', 'is_active', 'status', 'payment_status', 'reason']
@@ -1,5 +1,7 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from core.async_views import async_routes
 from .views import MembershipViewSet, MembershipRegistrationViewSet
 
 router = DefaultRouter()
@@ -9,3 +11,8 @@ router.register(r'registrations', MembershipRegistrationViewSet, basename='membe
 urlpatterns = [
     path('', include(router.urls)),
 ]
+
+if settings.ASYNC_VIEWS:
+    # Served ahead of the router's sync routes under ASGI
+    urlpatterns = async_routes('list', MembershipViewSet, 'membership') + urlpatterns
+
@@ -6,6 +6,7 @@ from django_filters.rest_framework import DjangoFilterBackend
 from django.core.mail import EmailMessage
 from django.template.loader import render_to_string
 from django.conf import settings
+from django.db import transaction
 from .models import Membership, MembershipRegistration
 from .serializers import (
     MembershipSerializer, 
@@ -14,10 +15,23 @@ from .serializers import (
 )
 from .filters import MembershipFilter
 from users.pagination import CustomPagination
+from core.prefetch import EagerLoadingMixin
+from core.compiled_serializers import CompiledListMixin
+from core.sparse_fields import SparseFieldsMixin
+from core.conditional import ConditionalGetMixin
+from core.counters import CountedWriteMixin
+from core.response_cache import ResponseCacheMixin
+from core.async_views import AsyncReadMixin
+from core.sideload import SideloadMixin
 from users.permissions import IsStaffOrSuperAdmin
+from core.events import (
+    publish_registration_created,
+    publish_status_changed,
+    publish_payment_completed
+)
 from django.utils import timezone
 
-class MembershipViewSet(viewsets.ModelViewSet):
+class MembershipViewSet(ResponseCacheMixin, ConditionalGetMixin, SparseFieldsMixin, CompiledListMixin, AsyncReadMixin, viewsets.ModelViewSet):
     queryset = Membership.objects.filter()
     serializer_class = MembershipSerializer
     pagination_class = CustomPagination
@@ -32,7 +46,7 @@ class MembershipViewSet(viewsets.ModelViewSet):
         return [permission() for permission in permission_classes]
 
 
-class MembershipRegistrationViewSet(viewsets.ModelViewSet):
+class MembershipRegistrationViewSet(CountedWriteMixin, ConditionalGetMixin, SideloadMixin, SparseFieldsMixin, CompiledListMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     serializer_class = MembershipRegistrationSerializer
     pagination_class = CustomPagination
     filter_backends = [DjangoFilterBackend]
@@ -54,6 +68,7 @@ class MembershipRegistrationViewSet(viewsets.ModelViewSet):
             return MembershipRegistrationListSerializer
         return MembershipRegistrationSerializer
 
+    @transaction.atomic
     def create(self, request, *args, **kwargs):
         """Create a new membership registration"""
         data = request.data.copy()
@@ -70,6 +85,7 @@ class MembershipRegistrationViewSet(viewsets.ModelViewSet):
         self.perform_create(serializer)
 
         registration = serializer.instance
+        publish_registration_created('membership', registration)
         user = registration.user
         html_content = render_to_string('emails/registration.html', {
             'user_name': getattr(user, 'name', user.email),
@@ -96,7 +112,16 @@ class MembershipRegistrationViewSet(viewsets.ModelViewSet):
             serializer.validated_data['user_id'] = self.request.user.id
         serializer.save()
 
+    def perform_update(self, serializer):
+        """Publish status and payment changes for live dashboards"""
+        old_status = serializer.instance.status
+        old_payment_status = serializer.instance.payment_status
+        registration = serializer.save()
+        publish_status_changed('membership', registration, old_status)
+        publish_payment_completed(registration, old_payment_status)
+
     @action(detail=True, methods=['patch'], permission_classes=[IsAuthenticated, IsStaffOrSuperAdmin])
+    @transaction.atomic
     def change_status(self, request, pk=None):
         """
         Change membership registration status.
@@ -128,6 +153,7 @@ class MembershipRegistrationViewSet(viewsets.ModelViewSet):
             )
         
         # Update the status manually
+        old_status = registration.status
         registration.status = new_status
         
         # Update rejection reason if provided
@@ -135,6 +161,7 @@ class MembershipRegistrationViewSet(viewsets.ModelViewSet):
             registration.rejection_reason = rejection_reason
         
         registration.save()
+        publish_status_changed('membership', registration, old_status)
 
         if registration.status in ['accepted', 'rejected']:
             user = registration.user
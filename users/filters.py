@@ -1,5 +1,7 @@
 import django_filters
+from django.contrib.postgres.search import TrigramSimilarity
 from django.db.models import Q
+from django.db.models.functions import Greatest
 from .models import User
 
 class UserFilter(django_filters.FilterSet):
@@ -12,7 +14,22 @@ class UserFilter(django_filters.FilterSet):
         fields = ['is_staff', 'is_superuser', 'name']
 
     def filter_name(self, queryset, name, value):
+        """
+        Substring match on name, email or phone number, closest match first
+        icontains compiles to UPPER(column) LIKE UPPER(...), the expression the
+        pg_trgm GIN indexes on User are built over.
+        """
+        value = value.strip()
+        if not value:
+            return queryset
         return queryset.filter(
             Q(name__icontains=value) |
-            Q(email__icontains=value)
-        )
\ No newline at end of file
+            Q(email__icontains=value) |
+            Q(phone_number__icontains=value)
+        ).annotate(
+            similarity=Greatest(
+                TrigramSimilarity('name', value),
+                TrigramSimilarity('email', value),
+                TrigramSimilarity('phone_number', value),
+            )
+        ).order_by('-similarity', 'id')
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.27 on 2026-10-18 17:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_user_email_verification_expires_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['created_at'], name='users_user_created_cf865c_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.27 on 2026-10-18 18:12
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without locking the users table against writes
+    atomic = False
+
+    dependencies = [
+        ('users', '0007_user_users_user_created_cf865c_idx'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='users_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        AddIndexConcurrently(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['email'], name='users_email_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        AddIndexConcurrently(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['phone_number'], name='users_phone_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.27 on 2026-10-18 19:06
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+    # Swap the indexes without locking the users table against writes
+    atomic = False
+
+    dependencies = [
+        ('users', '0008_user_trigram_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('name'), name='gin_trgm_ops'), name='users_name_upper_trgm_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('email'), name='gin_trgm_ops'), name='users_email_upper_trgm_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('phone_number'), name='gin_trgm_ops'), name='users_phone_upper_trgm_idx'),
+        ),
+        RemoveIndexConcurrently(
+            model_name='user',
+            name='users_name_trgm_idx',
+        ),
+        RemoveIndexConcurrently(
+            model_name='user',
+            name='users_email_trgm_idx',
+        ),
+        RemoveIndexConcurrently(
+            model_name='user',
+            name='users_phone_trgm_idx',
+        ),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db.models.functions import Upper
 from django.contrib.auth.models import AbstractBaseUser,BaseUserManager,PermissionsMixin
 from django.contrib.auth.hashers import make_password, check_password
 from django.utils import timezone
@@ -40,6 +42,16 @@ class User(AbstractBaseUser,PermissionsMixin):
 
     REQUIRED_FIELDS=["name"]
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at']),  # daily stats rollups
+            # pg_trgm indexes behind the admin user search (UserFilter); icontains
+            # compiles to UPPER(column) LIKE UPPER(...), so they index that expression
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='users_name_upper_trgm_idx'),
+            GinIndex(OpClass(Upper('email'), name='gin_trgm_ops'), name='users_email_upper_trgm_idx'),
+            GinIndex(OpClass(Upper('phone_number'), name='gin_trgm_ops'), name='users_phone_upper_trgm_idx'),
+        ]
+
     def set_password(self, raw_password):
         self.password=make_password(raw_password)
     
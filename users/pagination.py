@@ -1,7 +1,232 @@
-from rest_framework.pagination import PageNumberPagination
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.paginator import InvalidPage, Paginator, Page, EmptyPage, PageNotAnInteger
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination, CursorPagination
+
+
+def keyset_ordering(model):
+    """Model's default ordering with id appended as a tie-breaker"""
+    ordering = [field for field in model._meta.ordering if isinstance(field, str)]
+    if not ordering:
+        return ('-id',)
+    tie_breaker = '-id' if ordering[0].startswith('-') else 'id'
+    if tie_breaker not in ordering:
+        ordering.append(tie_breaker)
+    return tuple(ordering)
+
+
+def planner_row_estimate(queryset):
+    """Postgres planner row estimate for a model's table, or None if unknown"""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [connection.ops.quote_name(queryset.model._meta.db_table)],
+        )
+        row = cursor.fetchone()
+    # reltuples is -1 (or 0) until the table has been vacuumed/analyzed
+    return row[0] if row and row[0] > 0 else None
+
+
+class EstimatedPage(Page):
+    """Page whose has_next() comes from fetching one extra row"""
+
+    def __init__(self, object_list, number, paginator, has_more):
+        super().__init__(object_list, number, paginator)
+        self.has_more = has_more
+
+    def has_next(self):
+        return self.has_more
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that avoids exact COUNT(*) on large tables
+
+    Unfiltered querysets use the planner's row estimate; filtered ones
+    count at most `exact_threshold` + 1 rows and report the threshold as
+    a lower bound when it is exceeded. Below the threshold counts are exact.
+    """
+
+    def __init__(self, object_list, per_page, exact_threshold=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if exact_threshold is None:
+            exact_threshold = settings.PAGINATION_EXACT_COUNT_THRESHOLD
+        self.exact_threshold = exact_threshold
+        self.count_is_estimate = False
+
+    def _is_unfiltered(self):
+        query = self.object_list.query
+        return not query.where and not query.distinct and not query.combinator
+
+    def _bounded(self, bounded):
+        if bounded > self.exact_threshold:
+            self.count_is_estimate = True
+            return self.exact_threshold
+        return bounded
+
+    @cached_property
+    def count(self):
+        if self._is_unfiltered():
+            estimate = planner_row_estimate(self.object_list)
+            if estimate is not None and estimate > self.exact_threshold:
+                self.count_is_estimate = True
+                return estimate
+            return super().count
+        return self._bounded(self.object_list.order_by()[:self.exact_threshold + 1].count())
+
+    async def acount(self):
+        """Fill `count` through the async ORM"""
+        if 'count' in self.__dict__:
+            return self.count
+        if self._is_unfiltered():
+            estimate = await sync_to_async(planner_row_estimate)(self.object_list)
+            if estimate is not None and estimate > self.exact_threshold:
+                self.count_is_estimate = True
+                count = estimate
+            else:
+                count = await self.object_list.acount()
+        else:
+            count = self._bounded(await self.object_list.order_by()[:self.exact_threshold + 1].acount())
+        self.__dict__['count'] = count
+        return count
+
+    def validate_number(self, number):
+        if not self.count_is_estimate:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            raise EmptyPage('That page number is less than 1')
+        return number
+
+    def page(self, number):
+        # count decides whether the estimate path applies
+        self.count
+        if not self.count_is_estimate:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage('That page contains no results')
+        return EstimatedPage(rows[:self.per_page], number, self, len(rows) > self.per_page)
+
+    async def apage(self, number):
+        await self.acount()
+        if not self.count_is_estimate:
+            return await apage(self, number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = [row async for row in self.object_list[bottom:bottom + self.per_page + 1]]
+        if not rows and number > 1:
+            raise EmptyPage('That page contains no results')
+        return EstimatedPage(rows[:self.per_page], number, self, len(rows) > self.per_page)
+
+
+async def acount(paginator):
+    """Fill a paginator's cached `count` through the async ORM"""
+    if isinstance(paginator, EstimatedCountPaginator):
+        return await paginator.acount()
+    if 'count' not in paginator.__dict__:
+        paginator.__dict__['count'] = await paginator.object_list.acount()
+    return paginator.count
+
+
+async def apage(paginator, number):
+    """Paginator.page() with the count and the rows fetched through the async ORM"""
+    await acount(paginator)
+    page = paginator.page(number)
+    page.object_list = [row async for row in page.object_list]
+    return page
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination keyed on the model's default ordering
+    Pages are fetched with WHERE/ORDER BY/LIMIT instead of COUNT + OFFSET
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.ordering = keyset_ordering(queryset.model)
+        return super().paginate_queryset(queryset, request, view)
 
 
 class CustomPagination(PageNumberPagination):
+    """
+    Page-number pagination by default; clients opt into keyset pagination
+    per request with ?pagination=cursor (and then follow the `next` links)
+
+    Counts on large tables are estimated (flagged by `count_is_estimate`);
+    staff can request an exact count with ?count=exact.
+    """
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 100
+    django_paginator_class = EstimatedCountPaginator
+    cursor_paginator = None
+
+    def use_exact_count(self, request):
+        return request.query_params.get('count') == 'exact' and request.user.is_staff
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get('pagination') == 'cursor'
+            or KeysetPagination.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request):
+            self.cursor_paginator = KeysetPagination()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        self.cursor_paginator = None
+        if self.use_exact_count(request):
+            self.django_paginator_class = Paginator
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        paginate_queryset() for async views: page numbers fetch the count and
+        rows through the async ORM, cursor pagination runs in a thread
+        """
+        if self.use_cursor(request):
+            return await sync_to_async(self.paginate_queryset)(queryset, request, view)
+        self.cursor_paginator = None
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator_class = Paginator if self.use_exact_count(request) else self.django_paginator_class
+        paginator = paginator_class(queryset, page_size)
+        # ?page=last needs the count
+        await acount(paginator)
+        page_number = self.get_page_number(request, paginator)
+        try:
+            if isinstance(paginator, EstimatedCountPaginator):
+                self.page = await paginator.apage(page_number)
+            else:
+                self.page = await apage(paginator, page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return list(self.page)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        response = super().get_paginated_response(data)
+        response.data['count_is_estimate'] = getattr(self.page.paginator, 'count_is_estimate', False)
+        return response
@@ -1,6 +1,7 @@
 from rest_framework import  serializers
 from .models import User
 from django.contrib.auth import password_validation
+from core.fragments import FragmentCacheMixin, FragmentListSerializer
 
 class ContactSerializer(serializers.Serializer):
     name = serializers.CharField(max_length=255)
@@ -8,10 +9,11 @@ class ContactSerializer(serializers.Serializer):
     email = serializers.EmailField()
     message = serializers.CharField()
 
-class UserSimpleSerializer(serializers.ModelSerializer):
+class UserSimpleSerializer(FragmentCacheMixin, serializers.ModelSerializer):
     """Simple user serializer with minimal fields for nested usage"""
     class Meta:
         model = User
+        list_serializer_class = FragmentListSerializer
         fields = ['id', 'name', 'email', 'phone_number']
         read_only_fields = ['id']
 
@@ -1,3 +1,18 @@
+from django.db import connection
 from django.test import TestCase
+from .filters import UserFilter
+from .models import User
 
-# Create your tests here.
+
+class UserSearchTests(TestCase):
+    def test_search_uses_trigram_indexes(self):
+        User.objects.create_user(email='bob@example.com', name='Bob Smith', phone_number='5550100')
+        with connection.cursor() as cursor:
+            # The table is tiny, so make the planner show whether the indexes apply at all
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        queryset = UserFilter({'name': 'bob'}, queryset=User.objects.all()).qs
+
+        plan = queryset.explain()
+        for index in ('users_name_upper_trgm_idx', 'users_email_upper_trgm_idx', 'users_phone_upper_trgm_idx'):
+            self.assertIn(index, plan)
+        self.assertEqual([user.email for user in queryset], ['bob@example.com'])
@@ -1,7 +1,9 @@
 import django_filters
 from .models import Webinar
+from core.search import search_queryset
 
 class WebinarFilter(django_filters.FilterSet):
+    q = django_filters.CharFilter(method='filter_search')  # full-text, ranked
     title = django_filters.CharFilter(lookup_expr='icontains')  # partial search
     description = django_filters.CharFilter(lookup_expr='icontains')
     is_active = django_filters.BooleanFilter()
@@ -10,4 +12,7 @@ class WebinarFilter(django_filters.FilterSet):
 
     class Meta:
         model = Webinar
-        fields = ['title', 'description', 'is_active', 'event_date', 'created_at']
+        fields = ['q', 'title', 'description', 'is_active', 'event_date', 'created_at']
+
+    def filter_search(self, queryset, name, value):
+        return search_queryset(queryset, value)
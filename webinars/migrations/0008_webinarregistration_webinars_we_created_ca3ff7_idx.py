@@ -0,0 +1,17 @@
+# Generated by Django 4.2.27 on 2026-10-18 17:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webinars', '0007_webinarregistration_status'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='webinarregistration',
+            index=models.Index(fields=['created_at'], name='webinars_we_created_ca3ff7_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.27 on 2026-10-18 17:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webinars', '0008_webinarregistration_webinars_we_created_ca3ff7_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='webinarregistration',
+            index=models.Index(fields=['-registered_at', '-id'], name='webinars_we_registe_265eda_idx'),
+        ),
+    ]
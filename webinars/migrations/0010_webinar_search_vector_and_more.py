@@ -0,0 +1,34 @@
+# Generated by Django 4.2.27 on 2026-10-18 18:10
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+from django.contrib.postgres.search import SearchVector
+
+
+def populate_search_vector(apps, schema_editor):
+    Webinar = apps.get_model('webinars', 'Webinar')
+    Webinar.objects.update(search_vector=(
+        SearchVector('title', weight='A', config='english')
+        + SearchVector('description', weight='B', config='english')
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webinars', '0009_webinarregistration_webinars_we_registe_265eda_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='webinar',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='webinar',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='webinars_we_search__31ebb3_gin'),
+        ),
+        migrations.RunPython(populate_search_vector, migrations.RunPython.noop),
+    ]
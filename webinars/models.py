@@ -1,4 +1,6 @@
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from users.models import User
 
 class Webinar(models.Model):
@@ -9,9 +11,13 @@ class Webinar(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False)  # see core.search
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            GinIndex(fields=['search_vector']),
+        ]
 
     def __str__(self):
         return self.title
@@ -43,6 +49,10 @@ class WebinarRegistration(models.Model):
     class Meta:
         ordering = ['-registered_at']
         unique_together = ('webinar', 'user')  # One registration per user per webinar
+        indexes = [
+            models.Index(fields=['created_at']),  # daily stats rollups
+            models.Index(fields=['-registered_at', '-id']),  # keyset pagination
+        ]
 
     def __str__(self):
         return f"{self.user.email} - {self.webinar.title}"
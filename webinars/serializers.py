@@ -2,13 +2,15 @@ from rest_framework import serializers
 from .models import Webinar, WebinarRegistration
 from users.serializers import UserSerializer, UserSimpleSerializer
 from core.utils import validate_image_file
+from core.fragments import FragmentCacheMixin, FragmentListSerializer
 from django.core.exceptions import ValidationError
 
-class WebinarSerializer(serializers.ModelSerializer):
+class WebinarSerializer(FragmentCacheMixin, serializers.ModelSerializer):
     image = serializers.ImageField(required=False, allow_null=True)
     
     class Meta:
         model = Webinar
+        list_serializer_class = FragmentListSerializer
         fields = ['id', 'image', 'title', 'description', 'event_date', 'is_active', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
     
@@ -30,6 +32,7 @@ class WebinarRegistrationSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = WebinarRegistration
+        list_serializer_class = FragmentListSerializer
         fields = [
             'id', 'webinar', 'webinar_id', 'user', 'user_id', 'registered_at', 
             'attended', 'attendance_marked_at', 'status', 'reason', 'rejection_reason', 
@@ -48,6 +51,7 @@ class WebinarRegistrationListSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = WebinarRegistration
+        list_serializer_class = FragmentListSerializer
         fields = ['id', 'webinar', 'user', 'registered_at', 'attended', 'status', 'reason']
 
 
@@ -1,3 +1,47 @@
-from django.test import TestCase
+import threading
+from datetime import date
+from django.db import connection, transaction
+from django.test import TransactionTestCase
+from rest_framework.test import APIClient
+from core.counters import read_counters
+from users.models import User
+from .models import Webinar, WebinarRegistration
 
-# Create your tests here.
+
+class ChangeStatusCounterTests(TransactionTestCase):
+    def test_concurrent_change_applies_one_delta(self):
+        staff = User.objects.create_user(email='staff@example.com', name='Staff', phone_number='5550101', is_staff=True)
+        member = User.objects.create_user(email='member@example.com', name='Member', phone_number='5550102')
+        webinar = Webinar.objects.create(title='Intro', description='', event_date=date(2030, 1, 1))
+        registration = WebinarRegistration.objects.create(webinar=webinar, user=member)
+        before = read_counters()['webinar_registration']
+
+        locked, finished, responses = threading.Event(), threading.Event(), []
+
+        def concurrent_request():
+            locked.wait()
+            client = APIClient()
+            client.force_authenticate(staff)
+            # Loads the row while the other transaction still holds it as uncommitted 'accepted'
+            responses.append(client.patch(
+                f'/api/v1/webinars/registrations/{registration.pk}/change_status/',
+                {'status': 'accepted'}, format='json',
+            ))
+            connection.close()
+            finished.set()
+
+        thread = threading.Thread(target=concurrent_request)
+        thread.start()
+        with transaction.atomic():
+            row = WebinarRegistration.objects.select_for_update().get(pk=registration.pk)
+            row.status = 'accepted'
+            row.save()
+            locked.set()
+            # The request has to wait for this transaction instead of reading 'pending'
+            self.assertFalse(finished.wait(0.5))
+        thread.join()
+
+        self.assertEqual(responses[0].status_code, 200)
+        counters = read_counters()['webinar_registration']
+        self.assertEqual(counters['status:accepted']['value'], before['status:accepted']['value'] + 1)
+        self.assertEqual(counters['status:pending']['value'], before['status:pending']['value'] - 1)
@@ -2,11 +2,12 @@ from rest_framework import viewsets, status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+from rest_framework.parsers import MultiPartParser, FormParser
 from django_filters.rest_framework import DjangoFilterBackend
 from django.core.mail import EmailMessage
 from django.template.loader import render_to_string
 from django.conf import settings
+from django.db import transaction
 from .models import Webinar, WebinarRegistration
 from .serializers import (
     WebinarSerializer, 
@@ -18,10 +19,20 @@ from .serializers import (
 )
 from .filters import WebinarFilter
 from users.pagination import CustomPagination
+from core.prefetch import EagerLoadingMixin
+from core.compiled_serializers import CompiledListMixin
+from core.sparse_fields import SparseFieldsMixin
+from core.conditional import ConditionalGetMixin
+from core.counters import CountedWriteMixin
+from core.response_cache import ResponseCacheMixin
+from core.async_views import AsyncReadMixin
+from core.parsers import ORJSONParser
+from core.sideload import SideloadMixin
 from users.permissions import IsStaffOrSuperAdmin
+from core.events import publish_registration_created, publish_status_changed
 from django.utils import timezone
 
-class WebinarViewSet(viewsets.ModelViewSet):
+class WebinarViewSet(ResponseCacheMixin, ConditionalGetMixin, SparseFieldsMixin, CompiledListMixin, AsyncReadMixin, viewsets.ModelViewSet):
     queryset = Webinar.objects.filter()
     serializer_class = WebinarSerializer
     pagination_class = CustomPagination
@@ -37,12 +48,13 @@ class WebinarViewSet(viewsets.ModelViewSet):
             permission_classes = [IsAuthenticated, IsStaffOrSuperAdmin]
         return [permission() for permission in permission_classes]
 
-class WebinarRegistrationViewSet(viewsets.ModelViewSet):
+class WebinarRegistrationViewSet(CountedWriteMixin, ConditionalGetMixin, SideloadMixin, SparseFieldsMixin, CompiledListMixin, EagerLoadingMixin, viewsets.ModelViewSet):
+    locked_actions = CountedWriteMixin.locked_actions + ('mark_attendance', 'reject')
     serializer_class = WebinarRegistrationSerializer
     pagination_class = CustomPagination
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['attended', 'user', 'webinar', 'status']
-    parser_classes = (MultiPartParser, FormParser, JSONParser)
+    parser_classes = (MultiPartParser, FormParser, ORJSONParser)
 
     def get_queryset(self):
         user = self.request.user
@@ -69,6 +81,7 @@ class WebinarRegistrationViewSet(viewsets.ModelViewSet):
             return WebinarRegistrationStatusSerializer
         return WebinarRegistrationSerializer
 
+    @transaction.atomic
     def create(self, request, *args, **kwargs):
         """Register user for a webinar"""
         data = request.data.copy()
@@ -85,6 +98,7 @@ class WebinarRegistrationViewSet(viewsets.ModelViewSet):
         self.perform_create(serializer)
 
         registration = serializer.instance
+        publish_registration_created('webinar', registration)
         user = registration.user
         html_content = render_to_string('emails/registration.html', {
             'user_name': getattr(user, 'name', user.email),
@@ -112,6 +126,7 @@ class WebinarRegistrationViewSet(viewsets.ModelViewSet):
         serializer.save()
 
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated, IsStaffOrSuperAdmin])
+    @transaction.atomic
     def mark_attendance(self, request, pk=None):
         """Mark attendance for a webinar registration"""
         registration = self.get_object()
@@ -126,6 +141,7 @@ class WebinarRegistrationViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated, IsStaffOrSuperAdmin])
+    @transaction.atomic
     def reject(self, request, pk=None):
         """
         Reject/Cancel registration with reason.
@@ -142,6 +158,7 @@ class WebinarRegistrationViewSet(viewsets.ModelViewSet):
         )
 
     @action(detail=True, methods=['patch'], permission_classes=[IsAuthenticated, IsStaffOrSuperAdmin])
+    @transaction.atomic
     def change_status(self, request, pk=None):
         """
         Change registration status.
@@ -172,12 +189,14 @@ class WebinarRegistrationViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        old_status = registration.status
         registration.status = new_status
         
         if rejection_reason:
             registration.rejection_reason = rejection_reason
         
         registration.save()
+        publish_status_changed('webinar', registration, old_status)
 
         if registration.status in ['accepted', 'rejected']:
             user = registration.user